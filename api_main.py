@@ -4,219 +4,427 @@ FastAPI REST API for 24/7 Shift Scheduler and Optimizer
 """
 
 import os
+import time
+import shutil
+import string
+import hashlib
+import uuid
 import tempfile
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
+import aiofiles.tempfile
+import orjson
+from fastapi import APIRouter, FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
+from fastapi.responses import FileResponse, JSONResponse, Response
 import uvicorn
 
-# Add src directory to Python path
-import sys
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from processing.processor import ShiftProcessor
+from src import solver_pool
+
+# Solves of jobs submitted through /process/async in this worker, keyed by
+# task id and held so the tasks are not garbage collected while running.
+# Their state lives in status files next to the result cache so any server
+# worker can answer the polls.
+job_tasks: Dict[str, asyncio.Task] = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the result cache janitor while the app is up."""
+    janitor = asyncio.create_task(_result_cache_janitor())
+    try:
+        yield
+    finally:
+        janitor.cancel()
+
+# Excel upload endpoints; mounted by src.app_factory.create_app
+router = APIRouter(lifespan=lifespan)
+
+# Upload limit for /process (50MB); requests declaring a larger body are
+# refused before the multipart parser spools anything to disk. The declared
+# length also covers the multipart framing and form fields, hence the slack.
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Reject requests whose Content-Length exceeds a limit without reading the body."""
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_body_size:
+                        response = JSONResponse(
+                            status_code=413,
+                            content={"detail": "File too large. Maximum size is 50MB."}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Planificador de Turnos API",
-    description="API REST para optimización de turnos 24/7 en puestos de seguridad",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Thread pool for CPU-intensive tasks
-executor = ThreadPoolExecutor(max_workers=2)
+# Uploads are copied to disk in chunks of this size to keep memory bounded
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-@app.get("/")
-async def root():
-    """Root endpoint with basic API information."""
-    return {
-        "message": "Planificador de Turnos API",
-        "version": "1.0.0",
-        "status": "running",
-        "docs": "/docs"
-    }
+# Results of previous solves, keyed by upload content hash and options, so a
+# re-submitted configuration is served without running the solver again
+RESULT_CACHE_DIR = Path(os.environ.get("RESULT_CACHE_DIR", Path(tempfile.gettempdir()) / "shift_cache"))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 3600))
+RESULT_CACHE_JANITOR_INTERVAL = max(60, RESULT_CACHE_TTL // 4)
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for DigitalOcean App Platform."""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "service": "planificador-turnos"
-    }
+# Status files of unfinished jobs are refreshed on every janitor pass by the
+# worker running them; one left untouched this long belonged to a worker that
+# exited, and the job is marked failed
+ORPHANED_JOB_AGE = 3 * RESULT_CACHE_JANITOR_INTERVAL
 
-@app.post("/process")
-async def process_schedule(
-    config_file: UploadFile = File(..., description="Configuration Excel file"),
-    strategy: str = Form(default="lexicographic", description="Optimization strategy: lexicographic or weighted"),
-    log_level: str = Form(default="INFO", description="Logging level: DEBUG, INFO, WARNING, ERROR"),
-    generate_validation: bool = Form(default=False, description="Generate detailed validation report")
-):
+# Job states; only finished jobs expire with the result cache
+JOB_FINISHED_STATES = frozenset({"done", "error"})
+
+EXCEL_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Accepted /process form values
+ALLOWED_EXTENSIONS = frozenset({'.xlsx', '.xls'})
+STRATEGIES = frozenset({'lexicographic', 'weighted'})
+LOG_LEVELS = frozenset({'DEBUG', 'INFO', 'WARNING', 'ERROR'})
+
+# Static responses are serialized once at import time. ROOT_JSON is served at
+# "/" by src.app_factory.create_app.
+ROOT_JSON = orjson.dumps({
+    "message": "Planificador de Turnos API",
+    "version": "1.0.0",
+    "status": "running",
+    "docs": "/docs"
+})
+
+def _remove_temp_file(path: Optional[str]) -> None:
+    """Delete a temporary file, ignoring files that are already gone."""
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to clean up temp file {path}: {e}")
+
+def _remove_temp_dir(path: Optional[str]) -> None:
+    """Delete a per-request output directory and everything written into it."""
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _lookup_cached_result(cache_key: str):
+    """Return (path, stat, metadata) for a fresh cached result, or None."""
+    output_path = RESULT_CACHE_DIR / f"{cache_key}.xlsx"
+    try:
+        output_stat = os.stat(output_path)
+        metadata = orjson.loads((RESULT_CACHE_DIR / f"{cache_key}.json").read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if time.time() - output_stat.st_mtime > RESULT_CACHE_TTL:
+        return None
+    return str(output_path), output_stat, metadata
+
+def _store_cached_result(cache_key: str, output_file: str, metadata: dict) -> bool:
+    """Copy a generated schedule into the result cache; return whether it was stored."""
+    try:
+        RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, staging_file = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(output_file, staging_file)
+        (RESULT_CACHE_DIR / f"{cache_key}.json").write_bytes(orjson.dumps(metadata))
+        # Publish the workbook last and atomically so lookups never see a partial file
+        os.replace(staging_file, RESULT_CACHE_DIR / f"{cache_key}.xlsx")
+        return True
+    except OSError as e:
+        logger.warning(f"Failed to cache result {cache_key}: {e}")
+        return False
+
+def _prune_result_cache(live_jobs: Iterable[str] = ()) -> None:
     """
-    Process shift scheduling optimization.
+    Delete cache entries and finished job status files older than the TTL.
     
-    - **config_file**: Excel configuration file (.xlsx)
-    - **strategy**: Optimization strategy (lexicographic or weighted)
-    - **log_level**: Logging level for debugging
-    - **generate_validation**: Whether to generate validation report
-    
-    Returns the optimized schedule as an Excel file.
+    The status files of live_jobs, the unfinished jobs of this worker, are
+    refreshed instead. Unfinished jobs nobody refreshed for ORPHANED_JOB_AGE
+    are marked failed, since the worker running them is gone.
     """
+    for task_id in live_jobs:
+        try:
+            os.utime(_job_status_path(task_id))
+        except OSError:
+            pass
+    now = time.time()
+    try:
+        entries = list(os.scandir(RESULT_CACHE_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            age = now - entry.stat().st_mtime
+            if entry.name.startswith("job_"):
+                if age < min(RESULT_CACHE_TTL, ORPHANED_JOB_AGE):
+                    continue
+                job = orjson.loads(Path(entry.path).read_bytes())
+                if job["state"] in JOB_FINISHED_STATES:
+                    if age > RESULT_CACHE_TTL:
+                        os.unlink(entry.path)
+                elif age > ORPHANED_JOB_AGE:
+                    job["state"] = "error"
+                    job["error"] = "The server stopped before the task finished. Please submit the file again."
+                    _write_job_status(entry.name[len("job_"):-len(".json")], job)
+            elif age > RESULT_CACHE_TTL:
+                os.unlink(entry.path)
+        except (OSError, orjson.JSONDecodeError, KeyError):
+            pass
+
+async def _result_cache_janitor():
+    """Periodically prune expired cache entries and job status files."""
+    while True:
+        await asyncio.to_thread(_prune_result_cache, list(job_tasks))
+        await asyncio.sleep(RESULT_CACHE_JANITOR_INTERVAL)
+
+def _job_status_path(task_id: str) -> Path:
+    """Status file of a /process/async job, shared by all server workers."""
+    return RESULT_CACHE_DIR / f"job_{task_id}.json"
+
+def _write_job_status(task_id: str, job: dict) -> None:
+    """Publish a job's state atomically so polls never read a partial file."""
+    RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, staging_file = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps(job))
+    os.replace(staging_file, _job_status_path(task_id))
+
+def _read_job_status(task_id: str) -> Optional[dict]:
+    """Return a job's published state, or None if unknown or pruned."""
+    try:
+        return orjson.loads(_job_status_path(task_id).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def _schedule_file_response(path: str, output_stat: os.stat_result, metadata: dict,
+                            cache_status: str, background: Optional[BackgroundTasks]) -> FileResponse:
+    """Build the download response for an optimized schedule."""
+    # Generate filename with timestamp
+    output_filename = f"schedule_optimized_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    logger.info(f"Processing completed successfully. Returning file: {output_filename}")
     
+    return FileResponse(
+        path=path,
+        stat_result=output_stat,  # Reuse the stat already taken instead of another stat() call
+        media_type=EXCEL_MEDIA_TYPE,
+        filename=output_filename,
+        headers={
+            "Content-Disposition": f"attachment; filename={output_filename}",
+            "Content-Length": str(output_stat.st_size),
+            "X-Processing-Time": str(metadata["processing_time"]),
+            "X-Strategy-Used": metadata["strategy_used"],
+            "X-Total-Assignments": str(metadata["total_assignments"] or 0),
+            "X-Cache": cache_status
+        },
+        background=background
+    )
+
+def _validate_process_request(config_file: UploadFile, strategy: str, log_level: str) -> None:
+    """Reject invalid /process form input with a 4xx error."""
     # Validate file type
-    if not config_file.filename.endswith(('.xlsx', '.xls')):
+    if os.path.splitext(config_file.filename or '')[1].lower() not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail="Invalid file type. Only Excel files (.xlsx, .xls) are allowed."
         )
     
-    # Validate file size (50MB limit)
-    if config_file.size > 50 * 1024 * 1024:
+    # Validate file size (50MB limit); chunked uploads carry no Content-Length,
+    # so the middleware cannot catch those up front
+    if config_file.size > MAX_UPLOAD_SIZE:
         raise HTTPException(
             status_code=413,
             detail="File too large. Maximum size is 50MB."
         )
     
     # Validate strategy
-    if strategy not in ["lexicographic", "weighted"]:
+    if strategy not in STRATEGIES:
         raise HTTPException(
             status_code=400,
             detail="Invalid strategy. Must be 'lexicographic' or 'weighted'."
         )
     
     # Validate log level
-    if log_level not in ["DEBUG", "INFO", "WARNING", "ERROR"]:
+    if log_level not in LOG_LEVELS:
         raise HTTPException(
             status_code=400,
             detail="Invalid log level. Must be DEBUG, INFO, WARNING, or ERROR."
         )
+
+async def _save_upload(config_file: UploadFile) -> Tuple[str, str]:
+    """Stream an upload to a temp file and return (path, sha256 hex digest)."""
+    hasher = hashlib.sha256()
+    # Async I/O so the event loop is not blocked
+    async with aiofiles.tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_config:
+        try:
+            # Stream the upload instead of reading the whole body into memory
+            while True:
+                chunk = await config_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                await temp_config.write(chunk)
+            await temp_config.flush()  # Ensure data is written to disk
+        except BaseException:
+            await asyncio.to_thread(_remove_temp_file, temp_config.name)
+            raise
+    return temp_config.name, hasher.hexdigest()
+
+async def _run_processor(temp_config_file: str, digest: str, temp_output_file: str, strategy: str,
+                         log_level: str, generate_validation: bool,
+                         queue_timeout: Optional[float] = solver_pool.SOLVE_QUEUE_TIMEOUT,
+                         on_start: Optional[Callable[[], Awaitable]] = None) -> dict:
+    """
+    Solve in the process pool and return the result metadata.
+    
+    Waits up to queue_timeout seconds (forever if None) for a free solver
+    slot and raises a 503 if none frees up; on_start is awaited once the
+    slot is taken.
+    """
+    # Initialize processor
+    processor = ShiftProcessor()
+    
+    # Run processing in the process pool to avoid blocking
+    result = await solver_pool.run(
+        processor.process_schedule,
+        temp_config_file,
+        temp_output_file,
+        strategy,
+        log_level,
+        generate_validation,
+        digest,
+        solver_pool.SOLVER_PARAMS,
+        queue_timeout=queue_timeout,
+        on_start=on_start
+    )
+    
+    if not result.success:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Processing failed: {result.error_message}"
+        )
+    
+    return {
+        "processing_time": result.processing_time,
+        "strategy_used": result.strategy_used,
+        "total_assignments": result.total_assignments
+    }
+
+def _check_output_file(output_fd: int) -> os.stat_result:
+    """Verify the generated workbook through its open descriptor and return its stat."""
+    # Check file size through the descriptor held since creation
+    output_stat = os.fstat(output_fd)
+    file_size = output_stat.st_size
+    if file_size == 0:
+        raise HTTPException(
+            status_code=500,
+            detail="Generated file is empty."
+        )
+    
+    logger.info(f"Generated file size: {file_size} bytes")
+    
+    # Verify it's a valid Excel file by peeking at the first few bytes
+    try:
+        header = os.pread(output_fd, 4, 0)
+    except OSError as e:
+        logger.error(f"Error validating file format: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error validating generated file: {str(e)}"
+        )
+    
+    # Excel files should start with PK (ZIP signature) - 0x504B
+    if not header.startswith(b'PK'):
+        logger.error(f"Generated file doesn't have Excel signature. Header: {header}")
+        raise HTTPException(
+            status_code=500,
+            detail="Generated file is not a valid Excel format."
+        )
+    logger.info("File has valid Excel/ZIP signature")
+    
+    return output_stat
+
+def _result_cache_key(digest: str, strategy: str, generate_validation: bool) -> str:
+    """Cache key for a solve: upload content hash plus the options that affect the output."""
+    return f"{digest}_{strategy}_{int(generate_validation)}"
+
+@router.post("/process")
+async def process_schedule(
+    background_tasks: BackgroundTasks,
+    config_file: UploadFile = File(..., description="Configuration Excel file"),
+    strategy: str = Form(default="lexicographic", description="Optimization strategy: lexicographic or weighted"),
+    log_level: str = Form(default="INFO", description="Logging level: DEBUG, INFO, WARNING, ERROR"),
+    generate_validation: bool = Form(default=False, description="Generate detailed validation report")
+):
+    """
+    Process shift scheduling optimization.
+    
+    - **config_file**: Excel configuration file (.xlsx)
+    - **strategy**: Optimization strategy (lexicographic or weighted)
+    - **log_level**: Logging level for debugging
+    - **generate_validation**: Whether to generate validation report
+    
+    Returns the optimized schedule as an Excel file.
+    """
+    
+    _validate_process_request(config_file, strategy, log_level)
     
     temp_config_file = None
-    temp_output_file = None
+    temp_output_dir = None
+    output_fd = None
+    cleanup_deferred = False
     
     try:
         logger.info(f"Processing request - Strategy: {strategy}, Log Level: {log_level}, Validate: {generate_validation}")
         
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_config:
-            temp_config_file = temp_config.name
-            content = await config_file.read()
-            temp_config.write(content)
-            temp_config.flush()  # Ensure data is written to disk
-            # File will be closed when exiting with block
-        
-        # Create output file - use NamedTemporaryFile to ensure proper file creation
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_output:
-            temp_output_file = temp_output.name
-            # File is created but empty - this ensures proper file handle creation
+        temp_config_file, digest = await _save_upload(config_file)
         
-        # Initialize processor
-        processor = ShiftProcessor()
-        
-        # Run processing in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            executor,
-            processor.process_schedule,
-            temp_config_file,
-            temp_output_file,
-            strategy,
-            log_level,
-            generate_validation
-        )
+        # Serve a previous result for identical input without solving again
+        cache_key = _result_cache_key(digest, strategy, generate_validation)
+        cached = await asyncio.to_thread(_lookup_cached_result, cache_key)
+        if cached is not None:
+            cached_file, cached_stat, metadata = cached
+            logger.info(f"Serving cached result {cache_key}")
+            background_tasks.add_task(_remove_temp_file, temp_config_file)
+            cleanup_deferred = True
+            return _schedule_file_response(cached_file, cached_stat, metadata, "HIT", background_tasks)
         
-        if not result.success:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Processing failed: {result.error_message}"
-            )
+        # Create output file and keep its descriptor open so the result can be
+        # inspected after processing without reopening it by path. It gets its
+        # own directory because the validation report is written next to it.
+        temp_output_dir = tempfile.mkdtemp(prefix='shift_')
+        output_fd, temp_output_file = tempfile.mkstemp(suffix='.xlsx', dir=temp_output_dir)
         
-        # Check if output file was created and verify integrity
-        output_path = Path(temp_output_file)
-        if not output_path.exists():
-            raise HTTPException(
-                status_code=500,
-                detail="Output file was not created successfully."
-            )
+        metadata = await _run_processor(temp_config_file, digest, temp_output_file, strategy,
+                                        log_level, generate_validation)
+        output_stat = _check_output_file(output_fd)
         
-        # Check file size
-        file_size = output_path.stat().st_size
-        if file_size == 0:
-            raise HTTPException(
-                status_code=500,
-                detail="Generated file is empty."
-            )
+        # After the response has been sent, cache the result and remove the
+        # temp files; Starlette runs these sync tasks in its threadpool, off
+        # the event loop
+        background_tasks.add_task(_store_cached_result, cache_key, temp_output_file, metadata)
+        background_tasks.add_task(_remove_temp_file, temp_config_file)
+        background_tasks.add_task(_remove_temp_dir, temp_output_dir)
+        cleanup_deferred = True
         
-        logger.info(f"Generated file size: {file_size} bytes")
-        
-        # Try to verify it's a valid Excel file by reading the first few bytes
-        try:
-            with open(temp_output_file, 'rb') as f:
-                header = f.read(4)
-                # Excel files should start with PK (ZIP signature) - 0x504B
-                if not header.startswith(b'PK'):
-                    logger.error(f"Generated file doesn't have Excel signature. Header: {header}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Generated file is not a valid Excel format."
-                    )
-                else:
-                    logger.info("File has valid Excel/ZIP signature")
-        except Exception as e:
-            logger.error(f"Error validating file format: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error validating generated file: {str(e)}"
-            )
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"schedule_optimized_{timestamp}.xlsx"
-        
-        logger.info(f"Processing completed successfully. Returning file: {output_filename}")
-        
-        # Return the file with explicit cleanup
-        return FileResponse(
-            path=temp_output_file,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            filename=output_filename,
-            headers={
-                "Content-Disposition": f"attachment; filename={output_filename}",
-                "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                "X-Processing-Time": str(result.processing_time),
-                "X-Strategy-Used": result.strategy_used,
-                "X-Total-Assignments": str(result.total_assignments) if result.total_assignments else "0"
-            },
-            background=None  # Let FastAPI handle file cleanup
-        )
+        return _schedule_file_response(temp_output_file, output_stat, metadata, "MISS", background_tasks)
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -228,54 +436,185 @@ async def process_schedule(
             detail=f"Internal server error: {str(e)}"
         )
     finally:
-        # Clean up temporary config file only
-        try:
-            if temp_config_file and Path(temp_config_file).exists():
-                os.unlink(temp_config_file)
-        except Exception as e:
-            logger.warning(f"Failed to clean up temp config file: {e}")
+        if output_fd is not None:
+            os.close(output_fd)
         
-        # Note: We DON'T delete temp_output_file here because FastAPI
-        # is still reading it to send the response. It will be cleaned up
-        # automatically when the temp file handle goes out of scope.
+        # On failure nothing is streamed back, so remove the temp files now
+        # (in a thread, since unlink can be slow on some filesystems)
+        if not cleanup_deferred:
+            await asyncio.to_thread(_remove_temp_file, temp_config_file)
+            await asyncio.to_thread(_remove_temp_dir, temp_output_dir)
 
-@app.get("/docs/usage")
-async def api_usage_guide():
-    """Get API usage instructions."""
+async def _run_process_job(task_id: str, job: dict, temp_config_file: str, digest: str, strategy: str,
+                           log_level: str, generate_validation: bool) -> None:
+    """Solve a queued /process/async job and publish its result to the result cache."""
+    temp_output_dir = tempfile.mkdtemp(prefix='shift_')
+    output_fd, temp_output_file = tempfile.mkstemp(suffix='.xlsx', dir=temp_output_dir)
+    
+    async def mark_running():
+        job["state"] = "running"
+        await asyncio.to_thread(_write_job_status, task_id, job)
+    
+    try:
+        # Queued jobs wait for a solver slot instead of being rejected
+        job["metadata"] = await _run_processor(temp_config_file, digest, temp_output_file, strategy,
+                                               log_level, generate_validation, queue_timeout=None,
+                                               on_start=mark_running)
+        _check_output_file(output_fd)
+        if not await asyncio.to_thread(_store_cached_result, job["cache_key"], temp_output_file, job["metadata"]):
+            raise HTTPException(status_code=500, detail="Failed to store generated file.")
+        job["state"] = "done"
+        logger.info(f"Job {task_id} completed successfully")
+    except HTTPException as e:
+        job["state"] = "error"
+        job["error"] = e.detail
+    except Exception as e:
+        logger.error(f"Unexpected error during job {task_id}: {str(e)}", exc_info=True)
+        job["state"] = "error"
+        job["error"] = f"Internal server error: {str(e)}"
+    finally:
+        os.close(output_fd)
+        try:
+            await asyncio.to_thread(_write_job_status, task_id, job)
+        except OSError as e:
+            logger.error(f"Failed to record the state of job {task_id}: {e}")
+        await asyncio.to_thread(_remove_temp_file, temp_config_file)
+        await asyncio.to_thread(_remove_temp_dir, temp_output_dir)
+
+@router.post("/process/async", status_code=202)
+async def submit_process_job(
+    config_file: UploadFile = File(..., description="Configuration Excel file"),
+    strategy: str = Form(default="lexicographic", description="Optimization strategy: lexicographic or weighted"),
+    log_level: str = Form(default="INFO", description="Logging level: DEBUG, INFO, WARNING, ERROR"),
+    generate_validation: bool = Form(default=False, description="Generate detailed validation report")
+):
+    """
+    Queue a shift scheduling optimization and return immediately.
+    
+    Takes the same parameters as **POST /process**. Poll **GET /process/{task_id}**
+    until the state is `done`, then fetch the schedule from
+    **GET /process/{task_id}/download**.
+    """
+    
+    _validate_process_request(config_file, strategy, log_level)
+    
+    logger.info(f"Queueing request - Strategy: {strategy}, Log Level: {log_level}, Validate: {generate_validation}")
+    temp_config_file, digest = await _save_upload(config_file)
+    
+    task_id = uuid.uuid4().hex
+    cache_key = _result_cache_key(digest, strategy, generate_validation)
+    job = {"state": "pending", "cache_key": cache_key, "created": time.time()}
+    
+    # A previous result for identical input completes the job right away
+    cached = await asyncio.to_thread(_lookup_cached_result, cache_key) is not None
+    if cached:
+        await asyncio.to_thread(_remove_temp_file, temp_config_file)
+        job["state"] = "done"
+    try:
+        await asyncio.to_thread(_write_job_status, task_id, job)
+    except OSError as e:
+        await asyncio.to_thread(_remove_temp_file, temp_config_file)
+        logger.error(f"Failed to record job {task_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to queue the task.")
+    if not cached:
+        task = asyncio.create_task(
+            _run_process_job(task_id, job, temp_config_file, digest, strategy, log_level, generate_validation)
+        )
+        job_tasks[task_id] = task
+        task.add_done_callback(lambda _: job_tasks.pop(task_id, None))
+    
     return {
-        "title": "API Usage Guide",
-        "endpoints": {
-            "POST /process": {
-                "description": "Main endpoint for schedule optimization",
-                "parameters": {
-                    "config_file": "Excel file with configuration (required)",
-                    "strategy": "Optimization strategy: 'lexicographic' (default) or 'weighted'",
-                    "log_level": "Logging level: DEBUG, INFO (default), WARNING, ERROR",
-                    "generate_validation": "Generate validation report: true or false (default)"
-                },
-                "response": "Excel file with optimized schedule",
-                "max_file_size": "50MB",
-                "supported_formats": [".xlsx", ".xls"]
-            },
-            "GET /health": {
-                "description": "Health check endpoint",
-                "response": "Service health status"
+        "task_id": task_id,
+        "state": job["state"],
+        "poll_url": f"/process/{task_id}",
+        "download_url": f"/process/{task_id}/download"
+    }
+
+async def _get_job(task_id: str) -> dict:
+    """Look up a queued job or raise 404."""
+    # Task ids are uuid4 hex strings; anything else must not reach the filesystem
+    job = None
+    if len(task_id) == 32 and all(c in string.hexdigits for c in task_id):
+        job = await asyncio.to_thread(_read_job_status, task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired task id.")
+    return job
+
+@router.get("/process/{task_id}")
+async def get_process_job(task_id: str):
+    """Report the state of a queued job: pending, running, done or error."""
+    job = await _get_job(task_id)
+    status = {"task_id": task_id, "state": job["state"]}
+    if job["state"] == "error":
+        status["error"] = job["error"]
+    return status
+
+@router.get("/process/{task_id}/download")
+async def download_process_job(task_id: str):
+    """Download the optimized schedule of a finished job."""
+    job = await _get_job(task_id)
+    if job["state"] not in JOB_FINISHED_STATES:
+        raise HTTPException(status_code=409, detail="Task is still processing.")
+    if job["state"] == "error":
+        raise HTTPException(status_code=500, detail=job["error"])
+    
+    cached = await asyncio.to_thread(_lookup_cached_result, job["cache_key"])
+    if cached is None:
+        raise HTTPException(status_code=410, detail="Result has expired. Please submit the file again.")
+    cached_file, cached_stat, metadata = cached
+    return _schedule_file_response(cached_file, cached_stat, metadata, "HIT", None)
+
+_USAGE_GUIDE_JSON = orjson.dumps({
+    "title": "API Usage Guide",
+    "endpoints": {
+        "POST /process": {
+            "description": "Main endpoint for schedule optimization",
+            "parameters": {
+                "config_file": "Excel file with configuration (required)",
+                "strategy": "Optimization strategy: 'lexicographic' (default) or 'weighted'",
+                "log_level": "Logging level: DEBUG, INFO (default), WARNING, ERROR",
+                "generate_validation": "Generate validation report: true or false (default)"
             },
-            "GET /docs": {
-                "description": "Interactive API documentation"
-            }
+            "response": "Excel file with optimized schedule",
+            "max_file_size": "50MB",
+            "supported_formats": [".xlsx", ".xls"]
+        },
+        "POST /process/async": {
+            "description": "Queue an optimization and return a task id immediately (202)",
+            "parameters": "Same as POST /process",
+            "response": "task_id, state, poll_url and download_url"
+        },
+        "GET /process/{task_id}": {
+            "description": "Poll a queued optimization",
+            "response": "state: pending, running, done or error"
+        },
+        "GET /process/{task_id}/download": {
+            "description": "Download the optimized schedule of a finished task",
+            "response": "Excel file with optimized schedule"
+        },
+        "GET /health": {
+            "description": "Health check endpoint",
+            "response": "Service health status"
         },
-        "example_curl": """
+        "GET /docs": {
+            "description": "Interactive API documentation"
+        }
+    },
+    "example_curl": """
 curl -X POST "http://localhost:8000/process" \\
      -F "config_file=@config/optimizer_config.xlsx" \\
      -F "strategy=lexicographic" \\
      -F "log_level=INFO" \\
      -F "generate_validation=false" \\
      -o optimized_schedule.xlsx
-        """.strip()
-    }
+    """.strip()
+})
+
+@router.get("/docs/usage")
+async def api_usage_guide():
+    """Get API usage instructions."""
+    return Response(content=_USAGE_GUIDE_JSON, media_type="application/json")
 
-@app.exception_handler(413)
 async def request_entity_too_large_handler(request, exc):
     """Handle file too large errors."""
     return JSONResponse(
@@ -283,7 +622,6 @@ async def request_entity_too_large_handler(request, exc):
         content={"detail": "File too large. Maximum size is 50MB."}
     )
 
-@app.exception_handler(500)
 async def internal_server_error_handler(request, exc):
     """Handle internal server errors."""
     logger.error(f"Internal server error: {exc}", exc_info=True)
@@ -296,10 +634,14 @@ if __name__ == "__main__":
     # Get port from environment (DigitalOcean sets this)
     port = int(os.environ.get("PORT", 8000))
     print(f"Starting server on port {port}")
+    os.environ.setdefault("MODE", "legacy")
     uvicorn.run(
-        "api_main:app",
+        "src.app_factory:create_app",
+        factory=True,
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         reload=False,  # Disable reload in production
         log_level="info"
     )
\ No newline at end of file
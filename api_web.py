@@ -4,67 +4,46 @@ FastAPI Web Configuration API for the shift scheduler
 Modern web-based API that replaces Excel configuration
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import sys
-from pathlib import Path
-from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+import time
 import traceback
 import uvicorn
 import os
-
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
+import orjson
+from typing import Dict, Optional
 
 from src.shift_generator import generate_shifts
 from src.optimizer import ShiftOptimizer
 from src.verifier import verify_solution
 from src.api_models import *
 from src.web_config_service import WebConfigService
+from src import solver_pool
+from src.orjson_route import ORJSONRoute
 
-app = FastAPI(
-    title="Shift Scheduler API", 
-    version="2.0.0",
-    description="Web-based shift optimization API with flexible configuration",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
+# Web configuration endpoints; mounted by src.app_factory.create_app. The
+# optimization requests can be large, so their bodies are decoded with orjson.
+router = APIRouter(route_class=ORJSONRoute)
 
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
-
-@app.get("/")
-async def root():
-    return {
-        "message": "SERVAGRO Shift Scheduler API v2.0", 
-        "status": "running",
-        "endpoints": {
-            "health": "/health",
-            "quick_config": "/config/quick",
-            "validate_config": "/config/validate", 
-            "optimize": "/optimize",
-            "strategies": "/strategies",
-            "holidays": "/holidays",
-            "holidays_by_year": "/holidays/{year}",
-            "example": "/config/example"
-        }
+# Served at "/" by src.app_factory.create_app
+ROOT_JSON = orjson.dumps({
+    "message": "SERVAGRO Shift Scheduler API v2.0", 
+    "status": "running",
+    "endpoints": {
+        "health": "/health",
+        "quick_config": "/config/quick",
+        "validate_config": "/config/validate", 
+        "optimize": "/optimize",
+        "strategies": "/strategies",
+        "holidays": "/holidays",
+        "holidays_by_year": "/holidays/{year}",
+        "example": "/config/example"
     }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+})
 
 # === NEW WEB CONFIGURATION ENDPOINTS ===
 
-@app.post("/config/quick", response_model=QuickConfigResponse)
+@router.post("/config/quick", response_model=QuickConfigResponse)
 async def generate_quick_config(request: QuickConfigRequest):
     """
     Generate a complete optimization configuration from simple parameters
@@ -99,7 +78,7 @@ async def generate_quick_config(request: QuickConfigRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error generating configuration: {str(e)}")
 
-@app.post("/config/validate", response_model=ValidationResponse)  
+@router.post("/config/validate", response_model=ValidationResponse)  
 async def validate_config(config: OptimizationConfig):
     """
     Validate optimization configuration without running optimization
@@ -129,15 +108,29 @@ async def validate_config(config: OptimizationConfig):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
-@app.post("/optimize", response_model=OptimizationResponse)
+@router.post("/optimize", response_model=OptimizationResponse)
 async def optimize_with_web_config(request: OptimizationRequest):
     """
     Run shift optimization with web-based configuration
     
     Main endpoint for web interface optimization
     """
+    # The solve is CPU bound, so it runs in the solver pool and this worker
+    # keeps serving other requests meanwhile; when every solver slot is busy
+    # the pool answers 503 instead of queueing without bound. The pool process also serializes
+    # the response, so only the JSON bytes are sent back instead of the
+    # pickled model tree.
+    body = await solver_pool.run(run_optimization_json, request, solver_pool.SOLVER_PARAMS)
+    return Response(content=body, media_type="application/json")
+
+def run_optimization_json(request: OptimizationRequest, solver_params: Optional[Dict] = None) -> str:
+    """Run run_optimization and return the response serialized to JSON."""
+    return run_optimization(request, solver_params).model_dump_json()
+
+def run_optimization(request: OptimizationRequest, solver_params: Optional[Dict] = None) -> OptimizationResponse:
+    """Validate, solve and verify a web configuration (runs in a pool process)."""
     try:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Validate configuration first
         is_valid, errors, warnings = WebConfigService.validate_web_config(request.config)
@@ -155,7 +148,7 @@ async def optimize_with_web_config(request: OptimizationRequest):
         shifts = generate_shifts(internal_config)
         
         # Create optimizer and solve
-        optimizer = ShiftOptimizer(internal_config, shifts)
+        optimizer = ShiftOptimizer(internal_config, shifts, solver_params=solver_params)
         
         if request.strategy == OptimizationStrategy.LEXICOGRAPHIC:
             solution = optimizer.solve_lexicographic(
@@ -165,7 +158,7 @@ async def optimize_with_web_config(request: OptimizationRequest):
         else:
             solution = optimizer.solve_weighted(random_seed=request.seed)
         
-        solve_time = (datetime.now() - start_time).total_seconds()
+        solve_time = time.perf_counter() - start_time
         
         if solution.solver_status not in ["OPTIMAL", "FEASIBLE"]:
             return OptimizationResponse(
@@ -181,20 +174,18 @@ async def optimize_with_web_config(request: OptimizationRequest):
         # Verify solution
         verification = verify_solution(solution, internal_config, shifts)
         
-        # Convert solution to response format
-        employee_metrics = {}
-        for emp_id, metrics in solution.employee_metrics.items():
-            # Add emp_id to metrics if not present
-            metrics_with_id = {**metrics, 'emp_id': emp_id}
-            employee_metrics[emp_id] = EmployeeMetrics(**metrics_with_id)
-        
-        post_metrics = {}
-        for post_id, metrics in solution.post_metrics.items():
-            # Add post_id to metrics if not present
-            metrics_with_id = {**metrics, 'post_id': post_id}
-            post_metrics[post_id] = PostMetrics(**metrics_with_id)
-        
-        total_metrics = TotalMetrics(**solution.total_metrics)
+        # Convert solution to response format. The metrics stay plain dicts so
+        # OptimizationResponse validates all nested models in a single
+        # pydantic-core pass instead of one Python-level constructor per item
+        employee_metrics = {
+            emp_id: {**metrics, 'emp_id': emp_id}
+            for emp_id, metrics in solution.employee_metrics.items()
+        }
+        post_metrics = {
+            post_id: {**metrics, 'post_id': post_id}
+            for post_id, metrics in solution.post_metrics.items()
+        }
+        total_metrics = solution.total_metrics
         
         return OptimizationResponse(
             success=True,
@@ -221,227 +212,177 @@ async def optimize_with_web_config(request: OptimizationRequest):
             success=False,
             message=error_msg,
             solver_status="ERROR",
-            solve_time=(datetime.now() - start_time).total_seconds() if 'start_time' in locals() else 0,
+            solve_time=time.perf_counter() - start_time if 'start_time' in locals() else 0,
             optimization_strategy=request.strategy.value if 'request' in locals() else "unknown",
             sunday_strategy=request.sunday_strategy.value if 'request' in locals() else "unknown",
             random_seed=request.seed if 'request' in locals() else 42
         )
 
 # === UTILITY ENDPOINTS ===
+# These responses never change, so they are serialized once at import time
 
-@app.get("/config/example")
+EXAMPLE_CONFIG = OptimizationConfig(
+    global_config=GlobalConfig(),
+    holidays=[
+        HolidayConfig(date="2025-08-15", name="Assumption of Mary"),
+        HolidayConfig(date="2025-08-07", name="Battle of Boyacá")
+    ],
+    posts_count=3,
+    posts_config=[
+        PostConfig(
+            post_id="P001",
+            fixed_employees_count=3,
+            employee_salaries=[1400000.0, 1450000.0, 1380000.0]
+        ),
+        PostConfig(
+            post_id="P002", 
+            fixed_employees_count=3,
+            employee_salaries=[1420000.0, 1470000.0, 1390000.0]
+        ),
+        PostConfig(
+            post_id="P003",
+            fixed_employees_count=3,
+            employee_salaries=[1410000.0, 1460000.0, 1400000.0]
+        )
+    ],
+    comodines_count=2,
+    comodines_salaries=[1350000.0, 1370000.0]
+)
+
+_EXAMPLE_CONFIG_JSON = orjson.dumps({"example_config": EXAMPLE_CONFIG.model_dump(mode="json")})
+
+@router.get("/config/example")
 async def get_example_config():
     """Get an example configuration for reference"""
-    
-    example_config = OptimizationConfig(
-        global_config=GlobalConfig(),
-        holidays=[
-            HolidayConfig(date="2025-08-15", name="Assumption of Mary"),
-            HolidayConfig(date="2025-08-07", name="Battle of Boyacá")
-        ],
-        posts_count=3,
-        posts_config=[
-            PostConfig(
-                post_id="P001",
-                fixed_employees_count=3,
-                employee_salaries=[1400000.0, 1450000.0, 1380000.0]
-            ),
-            PostConfig(
-                post_id="P002", 
-                fixed_employees_count=3,
-                employee_salaries=[1420000.0, 1470000.0, 1390000.0]
-            ),
-            PostConfig(
-                post_id="P003",
-                fixed_employees_count=3,
-                employee_salaries=[1410000.0, 1460000.0, 1400000.0]
-            )
-        ],
-        comodines_count=2,
-        comodines_salaries=[1350000.0, 1370000.0]
-    )
-    
-    return {"example_config": example_config}
+    return Response(content=_EXAMPLE_CONFIG_JSON, media_type="application/json")
+
+_STRATEGIES_JSON = orjson.dumps({
+    "optimization_strategies": {
+        "lexicographic": "Multi-level optimization (HE > RF > RN) - Recommended",
+        "weighted": "Single weighted objective optimization"
+    },
+    "sunday_strategies": {
+        "smart": "Intelligent Sunday distribution (Champion + Helper + Others + COMODIN relief)",
+        "balanced": "Equal penalty for all employees having excess Sundays", 
+        "cost_focused": "Direct minimization of Sunday costs",
+        "load_balancing": "Balance total working hours equally among all employees",
+        "surcharge_equity": "Balance holiday and night hours (RF+RN surcharges) equitably among employees"
+    },
+    "recommended": {
+        "strategy": "lexicographic",
+        "sunday_strategy": "smart"
+    }
+})
 
-@app.get("/strategies")
+@router.get("/strategies")
 async def get_available_strategies():
     """Get available optimization and Sunday strategies"""
-    
-    return {
-        "optimization_strategies": {
-            "lexicographic": "Multi-level optimization (HE > RF > RN) - Recommended",
-            "weighted": "Single weighted objective optimization"
-        },
-        "sunday_strategies": {
-            "smart": "Intelligent Sunday distribution (Champion + Helper + Others + COMODIN relief)",
-            "balanced": "Equal penalty for all employees having excess Sundays", 
-            "cost_focused": "Direct minimization of Sunday costs",
-            "load_balancing": "Balance total working hours equally among all employees",
-            "surcharge_equity": "Balance holiday and night hours (RF+RN surcharges) equitably among employees"
-        },
-        "recommended": {
-            "strategy": "lexicographic",
-            "sunday_strategy": "smart"
-        }
-    }
+    return Response(content=_STRATEGIES_JSON, media_type="application/json")
+
+# Colombian holidays by year
+HOLIDAYS_DB = {
+    2024: [
+        {"date": "2024-01-01", "name": "Año Nuevo"},
+        {"date": "2024-01-08", "name": "Día de los Reyes Magos"},
+        {"date": "2024-03-25", "name": "Día de San José"},
+        {"date": "2024-03-28", "name": "Jueves Santo"},
+        {"date": "2024-03-29", "name": "Viernes Santo"},
+        {"date": "2024-05-01", "name": "Día del Trabajo"},
+        {"date": "2024-05-13", "name": "Ascensión del Señor"},
+        {"date": "2024-06-03", "name": "Corpus Christi"},
+        {"date": "2024-06-10", "name": "Sagrado Corazón de Jesús"},
+        {"date": "2024-07-01", "name": "San Pedro y San Pablo"},
+        {"date": "2024-07-20", "name": "Día de la Independencia"},
+        {"date": "2024-08-07", "name": "Batalla de Boyacá"},
+        {"date": "2024-08-19", "name": "Asunción de la Virgen"},
+        {"date": "2024-10-14", "name": "Día de la Raza"},
+        {"date": "2024-11-04", "name": "Todos los Santos"},
+        {"date": "2024-11-11", "name": "Independencia de Cartagena"},
+        {"date": "2024-12-08", "name": "Inmaculada Concepción"},
+        {"date": "2024-12-25", "name": "Navidad"}
+    ],
+    2025: [
+        {"date": "2025-01-01", "name": "Año Nuevo"},
+        {"date": "2025-01-06", "name": "Día de los Reyes Magos"},
+        {"date": "2025-03-24", "name": "Día de San José"},
+        {"date": "2025-04-17", "name": "Jueves Santo"},
+        {"date": "2025-04-18", "name": "Viernes Santo"},
+        {"date": "2025-05-01", "name": "Día del Trabajo"},
+        {"date": "2025-06-02", "name": "Ascensión del Señor"},
+        {"date": "2025-06-23", "name": "Corpus Christi"},
+        {"date": "2025-06-30", "name": "Sagrado Corazón de Jesús"},
+        {"date": "2025-06-30", "name": "San Pedro y San Pablo"},
+        {"date": "2025-07-20", "name": "Día de la Independencia"},
+        {"date": "2025-08-07", "name": "Batalla de Boyacá"},
+        {"date": "2025-08-18", "name": "Asunción de la Virgen"},
+        {"date": "2025-10-13", "name": "Día de la Raza"},
+        {"date": "2025-11-03", "name": "Todos los Santos"},
+        {"date": "2025-11-17", "name": "Independencia de Cartagena"},
+        {"date": "2025-12-08", "name": "Inmaculada Concepción"},
+        {"date": "2025-12-25", "name": "Navidad"}
+    ],
+    2026: [
+        {"date": "2026-01-01", "name": "Año Nuevo"},
+        {"date": "2026-01-12", "name": "Día de los Reyes Magos"},
+        {"date": "2026-03-23", "name": "Día de San José"},
+        {"date": "2026-04-02", "name": "Jueves Santo"},
+        {"date": "2026-04-03", "name": "Viernes Santo"},
+        {"date": "2026-05-01", "name": "Día del Trabajo"},
+        {"date": "2026-05-18", "name": "Ascensión del Señor"},
+        {"date": "2026-06-08", "name": "Corpus Christi"},
+        {"date": "2026-06-15", "name": "Sagrado Corazón de Jesús"},
+        {"date": "2026-06-29", "name": "San Pedro y San Pablo"},
+        {"date": "2026-07-20", "name": "Día de la Independencia"},
+        {"date": "2026-08-07", "name": "Batalla de Boyacá"},
+        {"date": "2026-08-17", "name": "Asunción de la Virgen"},
+        {"date": "2026-10-12", "name": "Día de la Raza"},
+        {"date": "2026-11-02", "name": "Todos los Santos"},
+        {"date": "2026-11-16", "name": "Independencia de Cartagena"},
+        {"date": "2026-12-08", "name": "Inmaculada Concepción"},
+        {"date": "2026-12-25", "name": "Navidad"}
+    ]
+}
+
+_HOLIDAYS_BY_YEAR_JSON = {
+    year: orjson.dumps({"year": year, "holidays": holidays, "count": len(holidays)})
+    for year, holidays in HOLIDAYS_DB.items()
+}
+
+_ALL_HOLIDAYS_JSON = orjson.dumps(
+    {
+        "available_years": list(HOLIDAYS_DB.keys()),
+        "holidays": HOLIDAYS_DB,
+        "total_holidays": sum(len(holidays) for holidays in HOLIDAYS_DB.values())
+    },
+    option=orjson.OPT_NON_STR_KEYS
+)
 
-@app.get("/holidays/{year}")
+@router.get("/holidays/{year}")
 async def get_holidays_by_year(year: int):
     """Get Colombian holidays for a specific year"""
     
-    holidays_db = {
-        2024: [
-            {"date": "2024-01-01", "name": "Año Nuevo"},
-            {"date": "2024-01-08", "name": "Día de los Reyes Magos"},
-            {"date": "2024-03-25", "name": "Día de San José"},
-            {"date": "2024-03-28", "name": "Jueves Santo"},
-            {"date": "2024-03-29", "name": "Viernes Santo"},
-            {"date": "2024-05-01", "name": "Día del Trabajo"},
-            {"date": "2024-05-13", "name": "Ascensión del Señor"},
-            {"date": "2024-06-03", "name": "Corpus Christi"},
-            {"date": "2024-06-10", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2024-07-01", "name": "San Pedro y San Pablo"},
-            {"date": "2024-07-20", "name": "Día de la Independencia"},
-            {"date": "2024-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2024-08-19", "name": "Asunción de la Virgen"},
-            {"date": "2024-10-14", "name": "Día de la Raza"},
-            {"date": "2024-11-04", "name": "Todos los Santos"},
-            {"date": "2024-11-11", "name": "Independencia de Cartagena"},
-            {"date": "2024-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2024-12-25", "name": "Navidad"}
-        ],
-        2025: [
-            {"date": "2025-01-01", "name": "Año Nuevo"},
-            {"date": "2025-01-06", "name": "Día de los Reyes Magos"},
-            {"date": "2025-03-24", "name": "Día de San José"},
-            {"date": "2025-04-17", "name": "Jueves Santo"},
-            {"date": "2025-04-18", "name": "Viernes Santo"},
-            {"date": "2025-05-01", "name": "Día del Trabajo"},
-            {"date": "2025-06-02", "name": "Ascensión del Señor"},
-            {"date": "2025-06-23", "name": "Corpus Christi"},
-            {"date": "2025-06-30", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2025-06-30", "name": "San Pedro y San Pablo"},
-            {"date": "2025-07-20", "name": "Día de la Independencia"},
-            {"date": "2025-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2025-08-18", "name": "Asunción de la Virgen"},
-            {"date": "2025-10-13", "name": "Día de la Raza"},
-            {"date": "2025-11-03", "name": "Todos los Santos"},
-            {"date": "2025-11-17", "name": "Independencia de Cartagena"},
-            {"date": "2025-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2025-12-25", "name": "Navidad"}
-        ],
-        2026: [
-            {"date": "2026-01-01", "name": "Año Nuevo"},
-            {"date": "2026-01-12", "name": "Día de los Reyes Magos"},
-            {"date": "2026-03-23", "name": "Día de San José"},
-            {"date": "2026-04-02", "name": "Jueves Santo"},
-            {"date": "2026-04-03", "name": "Viernes Santo"},
-            {"date": "2026-05-01", "name": "Día del Trabajo"},
-            {"date": "2026-05-18", "name": "Ascensión del Señor"},
-            {"date": "2026-06-08", "name": "Corpus Christi"},
-            {"date": "2026-06-15", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2026-06-29", "name": "San Pedro y San Pablo"},
-            {"date": "2026-07-20", "name": "Día de la Independencia"},
-            {"date": "2026-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2026-08-17", "name": "Asunción de la Virgen"},
-            {"date": "2026-10-12", "name": "Día de la Raza"},
-            {"date": "2026-11-02", "name": "Todos los Santos"},
-            {"date": "2026-11-16", "name": "Independencia de Cartagena"},
-            {"date": "2026-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2026-12-25", "name": "Navidad"}
-        ]
-    }
-    
-    if year not in holidays_db:
+    if year not in _HOLIDAYS_BY_YEAR_JSON:
         raise HTTPException(status_code=404, detail=f"Holidays not available for year {year}")
     
-    return {
-        "year": year,
-        "holidays": holidays_db[year],
-        "count": len(holidays_db[year])
-    }
+    return Response(content=_HOLIDAYS_BY_YEAR_JSON[year], media_type="application/json")
 
-@app.get("/holidays")
+@router.get("/holidays")
 async def get_all_holidays():
     """Get Colombian holidays for all available years (2024-2026)"""
-    
-    all_holidays = {
-        2024: [
-            {"date": "2024-01-01", "name": "Año Nuevo"},
-            {"date": "2024-01-08", "name": "Día de los Reyes Magos"},
-            {"date": "2024-03-25", "name": "Día de San José"},
-            {"date": "2024-03-28", "name": "Jueves Santo"},
-            {"date": "2024-03-29", "name": "Viernes Santo"},
-            {"date": "2024-05-01", "name": "Día del Trabajo"},
-            {"date": "2024-05-13", "name": "Ascensión del Señor"},
-            {"date": "2024-06-03", "name": "Corpus Christi"},
-            {"date": "2024-06-10", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2024-07-01", "name": "San Pedro y San Pablo"},
-            {"date": "2024-07-20", "name": "Día de la Independencia"},
-            {"date": "2024-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2024-08-19", "name": "Asunción de la Virgen"},
-            {"date": "2024-10-14", "name": "Día de la Raza"},
-            {"date": "2024-11-04", "name": "Todos los Santos"},
-            {"date": "2024-11-11", "name": "Independencia de Cartagena"},
-            {"date": "2024-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2024-12-25", "name": "Navidad"}
-        ],
-        2025: [
-            {"date": "2025-01-01", "name": "Año Nuevo"},
-            {"date": "2025-01-06", "name": "Día de los Reyes Magos"},
-            {"date": "2025-03-24", "name": "Día de San José"},
-            {"date": "2025-04-17", "name": "Jueves Santo"},
-            {"date": "2025-04-18", "name": "Viernes Santo"},
-            {"date": "2025-05-01", "name": "Día del Trabajo"},
-            {"date": "2025-06-02", "name": "Ascensión del Señor"},
-            {"date": "2025-06-23", "name": "Corpus Christi"},
-            {"date": "2025-06-30", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2025-06-30", "name": "San Pedro y San Pablo"},
-            {"date": "2025-07-20", "name": "Día de la Independencia"},
-            {"date": "2025-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2025-08-18", "name": "Asunción de la Virgen"},
-            {"date": "2025-10-13", "name": "Día de la Raza"},
-            {"date": "2025-11-03", "name": "Todos los Santos"},
-            {"date": "2025-11-17", "name": "Independencia de Cartagena"},
-            {"date": "2025-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2025-12-25", "name": "Navidad"}
-        ],
-        2026: [
-            {"date": "2026-01-01", "name": "Año Nuevo"},
-            {"date": "2026-01-12", "name": "Día de los Reyes Magos"},
-            {"date": "2026-03-23", "name": "Día de San José"},
-            {"date": "2026-04-02", "name": "Jueves Santo"},
-            {"date": "2026-04-03", "name": "Viernes Santo"},
-            {"date": "2026-05-01", "name": "Día del Trabajo"},
-            {"date": "2026-05-18", "name": "Ascensión del Señor"},
-            {"date": "2026-06-08", "name": "Corpus Christi"},
-            {"date": "2026-06-15", "name": "Sagrado Corazón de Jesús"},
-            {"date": "2026-06-29", "name": "San Pedro y San Pablo"},
-            {"date": "2026-07-20", "name": "Día de la Independencia"},
-            {"date": "2026-08-07", "name": "Batalla de Boyacá"},
-            {"date": "2026-08-17", "name": "Asunción de la Virgen"},
-            {"date": "2026-10-12", "name": "Día de la Raza"},
-            {"date": "2026-11-02", "name": "Todos los Santos"},
-            {"date": "2026-11-16", "name": "Independencia de Cartagena"},
-            {"date": "2026-12-08", "name": "Inmaculada Concepción"},
-            {"date": "2026-12-25", "name": "Navidad"}
-        ]
-    }
-    
-    return {
-        "available_years": list(all_holidays.keys()),
-        "holidays": all_holidays,
-        "total_holidays": sum(len(holidays) for holidays in all_holidays.values())
-    }
+    return Response(content=_ALL_HOLIDAYS_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     # Get port from environment (for deployment)
     port = int(os.environ.get("PORT", 8001))
     print(f"Starting SERVAGRO Shift Scheduler API v2.0 on port {port}")
+    os.environ.setdefault("MODE", "web")
     uvicorn.run(
-        "api_web:app",
+        "src.app_factory:create_app",
+        factory=True,
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         reload=False,
         log_level="info"
     )
\ No newline at end of file
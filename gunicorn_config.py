@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration for the shift scheduler API
+Runs several Uvicorn workers so concurrent requests can use all cores
+"""
+
+import os
+
+# Bind to the port provided by the platform (DigitalOcean sets PORT)
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Worker processes. Each solve first gets its CP-SAT search threads (up to 8
+# cores, see src/solver_pool.py), and the machine fits cpu_count // threads
+# such solves at once. Solves run in each worker's solver process pool and
+# every pool holds at least one, so by default there is one worker per solve
+# slot; the workers themselves mostly wait on I/O. A larger WEB_CONCURRENCY
+# still gives each worker one solve slot and so oversubscribes the cores.
+cpu_count = os.cpu_count() or 1
+solver_threads = int(os.environ.setdefault("SOLVER_NUM_WORKERS", str(min(8, cpu_count))))
+solve_slots = max(1, cpu_count // solver_threads)
+workers = int(os.environ.get("WEB_CONCURRENCY", solve_slots))
+os.environ.setdefault("MAX_CONCURRENT_SOLVES", str(max(1, solve_slots // workers)))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Optimizations can run for minutes, so allow long requests
+timeout = 600
+graceful_timeout = 30
+keepalive = 5
+
+# Load the application once in the master so workers share imported modules
+preload_app = True
+
+# Logging
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    """Import the solver stack in the master so forked workers share it."""
+    # The app import already pulls in the modules its routes use; these cover
+    # the rest of the /process pipeline (Excel I/O is imported lazily by
+    # pandas) so no worker or pool process pays for them on first use
+    import openpyxl  # noqa: F401
+    import xlsxwriter  # noqa: F401
+    from ortools.sat.python import cp_model  # noqa: F401
+    import processing.processor  # noqa: F401
+    server.log.info("Preloaded solver and Excel modules")
@@ -4,24 +4,45 @@ Shift Processor - Wrapper class for the existing shift optimization logic
 """
 
 import logging
-import sys
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import ClassVar, Dict, Optional
 
-import pandas as pd
-
-# Add src directory to path
-src_path = Path(__file__).parent.parent / 'src'
-sys.path.insert(0, str(src_path))
-
-from src.config_loader import load_config
+from src.config_loader import Config, load_config
 from src.shift_generator import generate_shifts
 from src.optimizer import ShiftOptimizer
-from src.result_exporter import export_solution, create_detailed_validation_report
+from src.result_exporter import export_solution, iter_validation_rows, export_validation_report
 from src.verifier import verify_solution
 
+
+# Parsed configurations keyed by the SHA-256 of the uploaded workbook. Every
+# upload is saved under a fresh temp path, so the content digest is the only
+# key that recognises a re-submitted file.
+CONFIG_CACHE_SIZE = 32
+_config_cache: "OrderedDict[str, Config]" = OrderedDict()
+
+
+def _load_config(config_path: Path, digest: Optional[str] = None):
+    """
+    Load configuration, reusing the parsed result for a known content digest.
+    
+    Without a digest the workbook is always parsed. The returned Config is
+    shared between calls and must be treated as read-only.
+    """
+    if digest is None:
+        return load_config(config_path)
+    config = _config_cache.get(digest)
+    if config is None:
+        config = load_config(config_path)
+        _config_cache[digest] = config
+        if len(_config_cache) > CONFIG_CACHE_SIZE:
+            _config_cache.popitem(last=False)
+    else:
+        _config_cache.move_to_end(digest)
+    return config
+
 @dataclass
 class ProcessingResult:
     """Result of schedule processing operation."""
@@ -39,11 +60,18 @@ class ShiftProcessor:
     Provides a clean interface for the FastAPI to call the existing processing logic.
     """
     
+    # Level last applied by _setup_logging in this process
+    _last_level: ClassVar[Optional[str]] = None
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
     def _setup_logging(self, log_level: str = "INFO") -> None:
         """Setup logging configuration for the processing operation."""
+        # Most requests use the same level; skip the logger lookups then
+        if ShiftProcessor._last_level == log_level:
+            return
+        
         # Set the log level for all relevant loggers
         loggers_to_configure = [
             __name__,
@@ -58,6 +86,7 @@ class ShiftProcessor:
         for logger_name in loggers_to_configure:
             logger = logging.getLogger(logger_name)
             logger.setLevel(level)
+        ShiftProcessor._last_level = log_level
     
     def process_schedule(
         self,
@@ -65,7 +94,9 @@ class ShiftProcessor:
         output_file: str,
         strategy: str = "lexicographic",
         log_level: str = "INFO",
-        validate: bool = False
+        validate: bool = False,
+        config_digest: Optional[str] = None,
+        solver_params: Optional[Dict] = None
     ) -> ProcessingResult:
         """
         Process shift schedule optimization.
@@ -76,12 +107,15 @@ class ShiftProcessor:
             strategy: Optimization strategy ("lexicographic" or "weighted")
             log_level: Logging level ("DEBUG", "INFO", "WARNING", "ERROR")
             validate: Whether to generate detailed validation report
+            config_digest: SHA-256 of the configuration file, used to reuse
+                a previously parsed configuration
+            solver_params: CP-SAT parameter overrides, e.g. num_workers
             
         Returns:
             ProcessingResult with success status and metadata
         """
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         validation_file = None
         
         try:
@@ -101,7 +135,7 @@ class ShiftProcessor:
             
             # Load configuration
             self.logger.info(f"Loading configuration from: {config_path}")
-            config = load_config(config_path)
+            config = _load_config(config_path, config_digest)
             self.logger.info(f"Configuration loaded successfully")
             self.logger.info(f"Year: {config.global_config.year}, Month: {config.global_config.month}")
             self.logger.info(f"Posts: {len(config.posts)}, Employees: {len(config.employees)}")
@@ -113,10 +147,10 @@ class ShiftProcessor:
             
             # Create and solve optimization model
             self.logger.info("Creating optimization model...")
-            optimizer = ShiftOptimizer(config, shifts)
+            optimizer = ShiftOptimizer(config, shifts, solver_params=solver_params)
             
             self.logger.info(f"Starting optimization using {strategy} strategy...")
-            optimization_start = datetime.now()
+            optimization_start = time.perf_counter()
             
             # Choose optimization strategy
             if strategy == "lexicographic" or config.global_config.use_lexicographic:
@@ -126,7 +160,7 @@ class ShiftProcessor:
                 solution = optimizer.solve_weighted()
                 actual_strategy = "weighted"
             
-            optimization_duration = (datetime.now() - optimization_start).total_seconds()
+            optimization_duration = time.perf_counter() - optimization_start
             
             # Check solution status
             if solution.solver_status not in ["OPTIMAL", "FEASIBLE"]:
@@ -172,13 +206,11 @@ class ShiftProcessor:
                 validation_file = output_path.parent / f"validation_{output_path.stem}.xlsx"
                 self.logger.info(f"Generating validation report: {validation_file}")
                 
-                validation_df = create_detailed_validation_report(solution, config, shifts)
-                with pd.ExcelWriter(validation_file, engine='openpyxl') as writer:
-                    validation_df.to_excel(writer, sheet_name='ValidationReport', index=False)
+                export_validation_report(iter_validation_rows(solution, config, shifts), validation_file)
                 
                 self.logger.info("Validation report generated")
             
-            total_duration = (datetime.now() - start_time).total_seconds()
+            total_duration = time.perf_counter() - start_time
             self.logger.info(f"Process completed successfully in {total_duration:.2f} seconds!")
             
             return ProcessingResult(
@@ -196,7 +228,7 @@ class ShiftProcessor:
             return ProcessingResult(
                 success=False,
                 error_message=error_msg,
-                processing_time=(datetime.now() - start_time).total_seconds()
+                processing_time=time.perf_counter() - start_time
             )
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
@@ -204,7 +236,7 @@ class ShiftProcessor:
             return ProcessingResult(
                 success=False,
                 error_message=error_msg,
-                processing_time=(datetime.now() - start_time).total_seconds()
+                processing_time=time.perf_counter() - start_time
             )
 
     def validate_config_file(self, config_file: str) -> ProcessingResult:
@@ -229,7 +261,7 @@ class ShiftProcessor:
                 )
             
             # Try to load configuration
-            config = load_config(config_path)
+            config = _load_config(config_path)
             
             # Basic validation checks
             if not config.posts:
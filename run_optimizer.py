@@ -7,10 +7,6 @@ existing configuration file.
 """
 
 import sys
-from pathlib import Path
-
-# Add src directory to Python path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from src.main import main
 
@@ -5,19 +5,13 @@ Following the official DO Python sample pattern
 """
 
 import os
-import sys
-from pathlib import Path
+import logging
 
-# Ensure imports work
-current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir))
-sys.path.insert(0, str(current_dir / 'src'))
+# Build the FastAPI app; MODE selects legacy, web or both (default web)
+from src.app_factory import create_app
+app = create_app()
 
-print("🚀 Starting Planificador de Turnos API")
-print(f"📁 Working directory: {current_dir}")
-
-# Import FastAPI app
-from api_web import app
+logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
     import uvicorn
@@ -25,12 +19,14 @@ if __name__ == "__main__":
     # Use same pattern as DO sample: int(os.getenv('PORT', default))
     port = int(os.getenv('PORT', 8000))
     
-    print(f"🌐 Listening on port {port}")
+    logger.info(f"Starting Planificador de Turnos API on port {port}")
     
     # Start server exactly like DO example pattern
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
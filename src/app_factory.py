@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Application factory for the shift scheduler APIs
+
+Builds a single FastAPI app serving the Excel upload API (api_main), the web
+configuration API (api_web) or both, selected with the MODE environment
+variable (legacy, web or both; default web).
+"""
+
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.routing import Route
+
+from . import solver_pool
+from .static_response import StaticResponse
+
+MODES = ("legacy", "web", "both")
+
+# Title, description and version shown in the docs for each mode
+APP_INFO = {
+    "legacy": {
+        "title": "Planificador de Turnos API",
+        "description": "API REST para optimización de turnos 24/7 en puestos de seguridad",
+        "version": "1.0.0",
+    },
+    "web": {
+        "title": "Shift Scheduler API",
+        "description": "Web-based shift optimization API with flexible configuration",
+        "version": "2.0.0",
+    },
+}
+APP_INFO["both"] = APP_INFO["web"]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the solver pool and warm up per-worker lazy state."""
+    async with solver_pool.lifespan(app):
+        # The pydantic models are fully built at import; the OpenAPI schema
+        # is not, and generating it walks every request/response model
+        app.openapi()
+        yield
+
+
+def create_app(mode: Optional[str] = None) -> FastAPI:
+    """
+    Create the API application.
+
+    Args:
+        mode: legacy, web or both; defaults to the MODE environment variable
+
+    Returns:
+        Configured FastAPI application
+    """
+    mode = mode or os.environ.get("MODE", "web")
+    if mode not in MODES:
+        raise ValueError(f"Invalid MODE '{mode}'. Must be one of: {', '.join(MODES)}")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
+
+    app = FastAPI(
+        **APP_INFO[mode],
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan
+    )
+
+    # Routers are imported here so each mode only loads what it serves
+    if mode in ("web", "both"):
+        import api_web
+        app.include_router(api_web.router)
+        root_json = api_web.ROOT_JSON
+
+    if mode in ("legacy", "both"):
+        import api_main
+        app.include_router(api_main.router)
+        app.add_exception_handler(413, api_main.request_entity_too_large_handler)
+        app.add_exception_handler(500, api_main.internal_server_error_handler)
+        # Added before CORS so that 413 responses still carry the CORS headers
+        app.add_middleware(
+            api_main.UploadSizeLimitMiddleware,
+            max_body_size=api_main.MAX_UPLOAD_SIZE + api_main.MULTIPART_OVERHEAD
+        )
+        if mode == "legacy":
+            root_json = api_main.ROOT_JSON
+
+    @app.get("/")
+    async def root():
+        """Root endpoint with basic API information."""
+        return Response(content=root_json, media_type="application/json")
+
+    # Health check endpoint for DigitalOcean App Platform. Probes hit it every
+    # few seconds, so it is served from a prebuilt body ahead of the FastAPI
+    # routes.
+    app.router.routes.insert(0, Route(
+        "/health",
+        endpoint=StaticResponse(orjson.dumps({"status": "healthy", "service": "planificador-turnos"})),
+        methods=["GET"],
+        name="health_check"
+    ))
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+    return app
@@ -1,11 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import singledispatch
 from datetime import datetime, date, time
-from typing import List, Dict, Optional
+from typing import Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GlobalConfig:
     year: int
     month: int
@@ -29,13 +31,13 @@ class GlobalConfig:
     w_base: float  # Base salary weight
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Holiday:
     date: date
     description: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Post:
     post_id: str
     nombre: str
@@ -44,7 +46,7 @@ class Post:
     allow_night_shift: bool
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Employee:
     emp_id: str
     tipo: str  # FIJO or COMODIN
@@ -58,48 +60,112 @@ class Employee:
     max_posts_if_comodin: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Config:
     global_config: GlobalConfig
-    holidays: List[Holiday]
-    posts: List[Post]
-    employees: List[Employee]
+    holidays: Tuple[Holiday, ...]
+    posts: Tuple[Post, ...]
+    employees: Tuple[Employee, ...]
+    # Lookup indexes derived from the tuples above
+    employees_by_id: Dict[str, Employee] = field(init=False, repr=False, compare=False)
+    posts_by_id: Dict[str, Post] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        # Frozen instances only accept attribute writes through object.__setattr__
+        object.__setattr__(self, 'employees_by_id', {emp.emp_id: emp for emp in self.employees})
+        object.__setattr__(self, 'posts_by_id', {post.post_id: post for post in self.posts})
 
+
+@singledispatch
 def parse_time(time_obj) -> time:
     """Parse time from various formats."""
-    if isinstance(time_obj, str):
-        return datetime.strptime(time_obj, "%H:%M").time()
-    elif isinstance(time_obj, time):
-        return time_obj
-    elif isinstance(time_obj, datetime):
-        return time_obj.time()
-    else:
-        raise ValueError(f"Cannot parse time: {time_obj}")
+    raise ValueError(f"Cannot parse time: {time_obj}")
+
+
+@parse_time.register
+def _(time_obj: str) -> time:
+    return datetime.strptime(time_obj, "%H:%M").time()
+
 
+@parse_time.register
+def _(time_obj: time) -> time:
+    return time_obj
 
+
+@parse_time.register
+def _(time_obj: datetime) -> time:
+    return time_obj.time()
+
+
+@singledispatch
 def parse_date(date_obj) -> date:
     """Parse date from various formats."""
-    if isinstance(date_obj, str):
-        return datetime.strptime(date_obj, "%Y-%m-%d").date()
-    elif isinstance(date_obj, datetime):
-        return date_obj.date()
-    elif isinstance(date_obj, date):
-        return date_obj
-    else:
-        raise ValueError(f"Cannot parse date: {date_obj}")
+    raise ValueError(f"Cannot parse date: {date_obj}")
+
+
+@parse_date.register
+def _(date_obj: str) -> date:
+    return datetime.strptime(date_obj, "%Y-%m-%d").date()
+
+
+# Registered separately because datetime is a subclass of date
+@parse_date.register
+def _(date_obj: datetime) -> date:
+    return date_obj.date()
+
+
+@parse_date.register
+def _(date_obj: date) -> date:
+    return date_obj
+
+
+def _parse_date_cell(value, sheet: str, column: str, row: int) -> date:
+    """Parse one date cell, naming its sheet and spreadsheet row on failure."""
+    try:
+        if pd.isna(value):
+            raise ValueError("empty cell")
+        return parse_date(value)
+    except ValueError as e:
+        raise ValueError(f"Sheet '{sheet}', row {row}: invalid {column} date {value!r}") from e
+
+
+def parse_date_column(column: pd.Series, sheet: str) -> np.ndarray:
+    """
+    Parse a whole column of YYYY-MM-DD dates to an array of date objects.
+
+    Raises ValueError naming the sheet and row of the first empty or
+    malformed cell.
+    """
+    # Spreadsheet rows are 1-based and the header takes the first one
+    rows = column.index + 2
+    try:
+        parsed = pd.to_datetime(column, format='%Y-%m-%d', errors='raise')
+    except pd.errors.OutOfBoundsDatetime:
+        # pandas < 3 parses into nanoseconds and rejects open-ended dates
+        # such as 9999-12-31; parse those columns cell by cell
+        return np.array([_parse_date_cell(value, sheet, column.name, row)
+                         for value, row in zip(column, rows)], dtype=object)
+    except ValueError:
+        # Re-parse cell by cell to report which row is malformed
+        for value, row in zip(column, rows):
+            _parse_date_cell(value, sheet, column.name, row)
+        raise
+    missing = parsed.isna().to_numpy()
+    if missing.any():
+        row = rows[missing.argmax()]
+        raise ValueError(f"Sheet '{sheet}', row {row}: invalid {column.name} date (empty cell)")
+    return parsed.dt.date.to_numpy()
 
 
 def load_config(xlsx_path: Path) -> Config:
     """Load configuration from Excel file."""
     
+    # Open and parse the workbook once for all four sheets
+    sheets = pd.read_excel(xlsx_path, sheet_name=['Global', 'Festivos', 'Puestos', 'Empleados'])
+    
     # Load Global sheet
-    global_df = pd.read_excel(xlsx_path, sheet_name='Global')
-    global_data = {}
-    for _, row in global_df.iterrows():
-        field = row['Campo']
-        value = row['Valor']
-        global_data[field] = value
+    global_df = sheets['Global']
+    global_data = dict(zip(global_df['Campo'].to_numpy(), global_df['Valor'].to_numpy()))
     
     global_config = GlobalConfig(
         year=int(global_data['Year']),
@@ -113,8 +179,9 @@ def load_config(xlsx_path: Path) -> Config:
         hours_per_week=float(global_data['HoursPerWeek']),
         min_fixed_per_post=int(global_data['MinFixedPerPost']),
         shift_length_hours=int(global_data['ShiftLengthHours']),
-        day_shift_start=parse_time(global_data['DayShiftStart']),
-        night_shift_start=parse_time(global_data['NightShiftStart']),
+        # The night shift starts ShiftLengthHours after the day shift, so
+        # NightShiftStart is implied and not read
+        shift_start_time=parse_time(global_data['DayShiftStart']),
         min_rest_hours=float(global_data['MinRestHours']),
         sunday_threshold=int(global_data['SundayThreshold']),
         max_posts_per_comodin=int(global_data['MaxPostsPerComodin']),
@@ -126,49 +193,58 @@ def load_config(xlsx_path: Path) -> Config:
     )
     
     # Load Holidays sheet
-    holidays_df = pd.read_excel(xlsx_path, sheet_name='Festivos')
+    holidays_df = sheets['Festivos']
     holidays = []
-    for _, row in holidays_df.iterrows():
+    holiday_dates = parse_date_column(holidays_df['Date'], 'Festivos')
+    for holiday_date, description in zip(holiday_dates, holidays_df['Description'].to_numpy()):
         holidays.append(Holiday(
-            date=parse_date(row['Date']),
-            description=row['Description']
+            date=holiday_date,
+            description=description
         ))
     
     # Load Posts sheet
-    posts_df = pd.read_excel(xlsx_path, sheet_name='Puestos')
+    posts_df = sheets['Puestos']
     posts = []
-    for _, row in posts_df.iterrows():
+    # itertuples yields plain tuples, avoiding a Series allocation per row
+    post_columns = ['PostID', 'Nombre', 'RequiredCoverage', 'AllowDayShift', 'AllowNightShift']
+    for post_id, nombre, coverage, allow_day, allow_night in posts_df[post_columns].itertuples(index=False, name=None):
         posts.append(Post(
-            post_id=row['PostID'],
-            nombre=row['Nombre'],
-            required_coverage=int(row['RequiredCoverage']),
-            allow_day_shift=bool(row['AllowDayShift']),
-            allow_night_shift=bool(row['AllowNightShift'])
+            post_id=post_id,
+            nombre=nombre,
+            required_coverage=int(coverage),
+            allow_day_shift=bool(allow_day),
+            allow_night_shift=bool(allow_night)
         ))
     
     # Load Employees sheet  
-    employees_df = pd.read_excel(xlsx_path, sheet_name='Empleados')
+    employees_df = sheets['Empleados']
     employees = []
-    for _, row in employees_df.iterrows():
+    employee_columns = ['EmpID', 'Tipo', 'AsignadoPostID', 'Empresa', 'Cargo', 'Cliente',
+                        'SalarioContrato', 'MaxPostsIfComodin']
+    desde_dates = parse_date_column(employees_df['DisponibleDesde'], 'Empleados')
+    hasta_dates = parse_date_column(employees_df['DisponibleHasta'], 'Empleados')
+    for (emp_id, tipo, post_id, empresa, cargo, cliente, salario, max_posts), desde, hasta in zip(
+            employees_df[employee_columns].itertuples(index=False, name=None), desde_dates, hasta_dates):
         # Handle missing values
-        max_posts = row['MaxPostsIfComodin'] if pd.notna(row['MaxPostsIfComodin']) else 4
+        if pd.isna(max_posts):
+            max_posts = 4
         
         employees.append(Employee(
-            emp_id=row['EmpID'],
-            tipo=row['Tipo'],
-            asignado_post_id=row['AsignadoPostID'] if pd.notna(row['AsignadoPostID']) else None,
-            empresa=row['Empresa'] if pd.notna(row['Empresa']) else '',
-            cargo=row['Cargo'] if pd.notna(row['Cargo']) else '',
-            cliente=row['Cliente'] if pd.notna(row['Cliente']) else '',
-            salario_contrato=float(row['SalarioContrato']),
-            disponible_desde=parse_date(row['DisponibleDesde']),
-            disponible_hasta=parse_date(row['DisponibleHasta']),
+            emp_id=emp_id,
+            tipo=tipo,
+            asignado_post_id=post_id if pd.notna(post_id) else None,
+            empresa=empresa if pd.notna(empresa) else '',
+            cargo=cargo if pd.notna(cargo) else '',
+            cliente=cliente if pd.notna(cliente) else '',
+            salario_contrato=float(salario),
+            disponible_desde=desde,
+            disponible_hasta=hasta,
             max_posts_if_comodin=int(max_posts)
         ))
     
     return Config(
         global_config=global_config,
-        holidays=holidays,
-        posts=posts,
-        employees=employees
+        holidays=tuple(holidays),
+        posts=tuple(posts),
+        employees=tuple(employees)
     )
\ No newline at end of file
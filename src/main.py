@@ -11,23 +11,33 @@ The system ensures complete coverage while respecting rest requirements,
 employee constraints, and business rules.
 """
 
+import os
 import sys
+import pickle
+import hashlib
 import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Optional
 import logging
-from datetime import datetime
+import time
 
-import pandas as pd
+# Parsed configs and their shifts are cached here, keyed by the workbook
+# contents. Bump CACHE_VERSION whenever loading or shift generation changes.
+CACHE_DIR = Path(".cache")
+CACHE_VERSION = 4
 
-from .config_loader import load_config
-from .shift_generator import generate_shifts
-from .optimizer import ShiftOptimizer
-from .result_exporter import export_solution, create_detailed_validation_report
-from .verifier import verify_solution, print_verification_report
+# Sunday strategies tried by --sunday-strategy all
+SUNDAY_STRATEGIES = ["smart", "balanced", "cost_focused"]
 
 
 def setup_logging(log_level: str = "INFO") -> None:
     """Setup logging configuration."""
+    # The format doesn't show thread or process details, so don't collect them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -37,6 +47,65 @@ def setup_logging(log_level: str = "INFO") -> None:
     )
 
 
+def load_config_and_shifts(config_path: Path, use_cache: bool = True):
+    """
+    Load the configuration and generate its shifts, reusing a previous run's
+    result while the configuration file is unchanged.
+    
+    Returns:
+        Tuple of (config, shifts)
+    """
+    from .config_loader import load_config
+    from .shift_generator import generate_shifts
+    
+    logger = logging.getLogger(__name__)
+    
+    if use_cache:
+        digest = hashlib.blake2b(config_path.read_bytes())
+        digest.update(str(CACHE_VERSION).encode())
+        cache_file = CACHE_DIR / f"{digest.hexdigest()}.pkl"
+        try:
+            with open(cache_file, 'rb') as f:
+                config, shifts = pickle.load(f)
+            logger.info("Using cached configuration and shifts: %s", cache_file)
+            return config, shifts
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Ignoring unreadable cache file %s: %s", cache_file, e)
+    
+    logger.info("Loading configuration from: %s", config_path)
+    config = load_config(config_path)
+    logger.info("Generating shifts...")
+    shifts = generate_shifts(config)
+    
+    if use_cache:
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            # Write then rename so a concurrent run never reads a partial file
+            fd, staging_file = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((config, shifts), f, protocol=5)
+            os.replace(staging_file, cache_file)
+        except OSError as e:
+            logger.warning("Failed to cache configuration: %s", e)
+    
+    return config, shifts
+
+
+def solve(config, shifts, strategy: str, sunday_strategy: str, seed: int,
+          solver_params: Optional[Dict] = None, merge_levels: Optional[bool] = None,
+          level_gap_limit: Optional[float] = None):
+    """Build and solve one optimization model; runs in a worker process for sweeps."""
+    from .optimizer import ShiftOptimizer
+    
+    optimizer = ShiftOptimizer(config, shifts, solver_params=solver_params, merge_levels=merge_levels,
+                               level_gap_limit=level_gap_limit)
+    if strategy == "lexicographic" or config.global_config.use_lexicographic:
+        return optimizer.solve_lexicographic(sunday_strategy=sunday_strategy, random_seed=seed)
+    return optimizer.solve_weighted(random_seed=seed)
+
+
 def main():
     """Main function to run the shift optimizer."""
     
@@ -70,11 +139,16 @@ def main():
         action="store_true",
         help="Generate detailed validation report"
     )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-check the solution against all constraints before exporting (always on with --log-level DEBUG)"
+    )
     parser.add_argument(
         "--sunday-strategy",
-        choices=["smart", "balanced", "cost_focused"],
+        choices=SUNDAY_STRATEGIES + ["all"],
         default="smart",
-        help="Sunday optimization strategy: smart (Sunday Champion - lowest paid employee takes more Sundays), balanced (equal distribution), cost_focused (direct cost minimization)"
+        help="Sunday optimization strategy: smart (Sunday Champion - lowest paid employee takes more Sundays), balanced (equal distribution), cost_focused (direct cost minimization), all (try each and keep the cheapest)"
     )
     parser.add_argument(
         "--seed",
@@ -82,86 +156,143 @@ def main():
         default=42,
         help="Random seed for deterministic results (default: 42)"
     )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=1,
+        help="Number of consecutive seeds to try, starting at --seed; the cheapest solution is kept (default: 1)"
+    )
+    parser.add_argument(
+        "--merge-levels",
+        action="store_true",
+        default=None,
+        help="Solve consecutive lexicographic levels as one exact weighted objective; "
+             "fewer solver restarts, faster on small configurations (default: SOLVER_MERGE_LEVELS, off)"
+    )
+    parser.add_argument(
+        "--level-gap-limit",
+        type=float,
+        help="Relative optimality gap accepted on every lexicographic level but the last, e.g. 0.01; "
+             "faster, but earlier priorities may end up that fraction above their optimum "
+             "(default: SOLVER_LEVEL_GAP_LIMIT, 0 = exact)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always reload the configuration instead of reusing the cache in {CACHE_DIR}/"
+    )
     
     args = parser.parse_args()
     
+    # Imported only once the arguments are valid: these pull in pandas and
+    # OR-tools, which --help and usage errors don't need
+    from .result_exporter import export_solution, iter_validation_rows, export_validation_report
+    from .verifier import verify_solution, print_verification_report
+    
     # Setup logging
     setup_logging(args.log_level)
     logger = logging.getLogger(__name__)
     
     try:
-        # Load configuration
-        logger.info(f"Loading configuration from: {args.config}")
-        config = load_config(args.config)
-        logger.info(f"Configuration loaded successfully")
-        logger.info(f"Year: {config.global_config.year}, Month: {config.global_config.month}")
-        logger.info(f"Posts: {len(config.posts)}, Employees: {len(config.employees)}")
+        # Load configuration and generate shifts
+        config, shifts = load_config_and_shifts(args.config, use_cache=not args.no_cache)
+        logger.info("Configuration loaded successfully")
+        logger.info("Year: %d, Month: %d", config.global_config.year, config.global_config.month)
+        logger.info("Posts: %d, Employees: %d", len(config.posts), len(config.employees))
+        logger.info("Generated %d shifts", len(shifts))
         
-        # Generate shifts
-        logger.info("Generating shifts...")
-        shifts = generate_shifts(config)
-        logger.info(f"Generated {len(shifts)} shifts")
-        
-        # Create and solve optimization model
-        logger.info("Creating optimization model...")
-        optimizer = ShiftOptimizer(config, shifts)
+        # Create and solve optimization model. The weighted model ignores the
+        # Sunday strategy, so sweeping over it would repeat the same solve.
+        lexicographic = args.strategy == "lexicographic" or config.global_config.use_lexicographic
+        if args.sunday_strategy == "all" and lexicographic:
+            sunday_strategies = SUNDAY_STRATEGIES
+        else:
+            sunday_strategies = [args.sunday_strategy]
+        seeds = range(args.seed, args.seed + max(1, args.seeds))
+        runs = [(sunday_strategy, seed) for sunday_strategy in sunday_strategies for seed in seeds]
         
-        logger.info(f"Starting optimization using {args.strategy} strategy...")
+        logger.info("Starting optimization using %s strategy...", args.strategy)
         if args.strategy == "lexicographic":
-            logger.info(f"Sunday strategy: {args.sunday_strategy}")
-        start_time = datetime.now()
+            logger.info("Sunday strategy: %s", args.sunday_strategy)
+        start_time = time.perf_counter()
         
-        if args.strategy == "lexicographic" or config.global_config.use_lexicographic:
-            solution = optimizer.solve_lexicographic(sunday_strategy=args.sunday_strategy, random_seed=args.seed)
+        if len(runs) == 1:
+            solution = solve(config, shifts, args.strategy, *runs[0], merge_levels=args.merge_levels,
+                             level_gap_limit=args.level_gap_limit)
         else:
-            solution = optimizer.solve_weighted(random_seed=args.seed)
+            # The runs are independent, so they are solved in parallel and the
+            # cheapest feasible solution is kept. The cores are split between
+            # the concurrent solves instead of each starting a thread per core.
+            logger.info("Solving %d combinations of Sunday strategy and seed in parallel...", len(runs))
+            cpu_count = os.cpu_count() or 1
+            max_workers = min(len(runs), max(1, cpu_count // 2))
+            solver_params = {'num_workers': max(1, cpu_count // max_workers)}
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(solve, config, shifts, args.strategy, sunday_strategy, seed,
+                                           solver_params, args.merge_levels, args.level_gap_limit)
+                           for sunday_strategy, seed in runs]
+                solutions = [future.result() for future in futures]
+            
+            feasible = []
+            for (sunday_strategy, seed), candidate in zip(runs, solutions):
+                if candidate.solver_status in ["OPTIMAL", "FEASIBLE"]:
+                    logger.info("  %s, seed %d: %s, total cost $%s", sunday_strategy, seed, candidate.solver_status,
+                                format(candidate.total_metrics['total_cost'], ',.2f'))
+                    feasible.append((candidate.total_metrics['total_cost'], sunday_strategy, seed, candidate))
+                else:
+                    logger.info("  %s, seed %d: %s", sunday_strategy, seed, candidate.solver_status)
+            
+            if feasible:
+                _, sunday_strategy, seed, solution = min(feasible, key=lambda run: run[0])
+                logger.info("Best solution: %s, seed %d", sunday_strategy, seed)
+            else:
+                solution = solutions[0]
         
-        solve_duration = (datetime.now() - start_time).total_seconds()
+        solve_duration = time.perf_counter() - start_time
         
         # Check solution status
         if solution.solver_status in ["OPTIMAL", "FEASIBLE"]:
-            logger.info(f"Optimization completed successfully in {solve_duration:.2f} seconds")
-            logger.info(f"Status: {solution.solver_status}")
-            logger.info(f"Active employees: {len(solution.active_employees)}")
-            logger.info(f"Total assignments: {len(solution.assignments)}")
+            logger.info("Optimization completed successfully in %.2f seconds", solve_duration)
+            logger.info("Status: %s", solution.solver_status)
+            logger.info("Active employees: %d", len(solution.active_employees))
+            logger.info("Total assignments: %d", len(solution.assignments))
             
             # Log key metrics
             metrics = solution.total_metrics
             logger.info("=== Key Metrics ===")
-            logger.info(f"Total cost: ${metrics['total_cost']:,.2f}")
-            logger.info(f"Overtime hours: {metrics['total_he_hours']}")
-            logger.info(f"Holiday hours applied: {metrics['total_rf_hours']}")
-            logger.info(f"Night hours: {metrics['total_rn_hours']}")
-            logger.info(f"Employees with excess sundays: {metrics['employees_with_excess_sundays']}")
+            logger.info("Total cost: $%s", format(metrics['total_cost'], ',.2f'))
+            logger.info("Overtime hours: %s", metrics['total_he_hours'])
+            logger.info("Holiday hours applied: %s", metrics['total_rf_hours'])
+            logger.info("Night hours: %s", metrics['total_rn_hours'])
+            logger.info("Employees with excess sundays: %s", metrics['employees_with_excess_sundays'])
             
         else:
-            logger.error(f"Optimization failed: {solution.solver_status}")
+            logger.error("Optimization failed: %s", solution.solver_status)
             return 1
         
         # Create output directory if needed
         args.output.parent.mkdir(parents=True, exist_ok=True)
         
-        # Verify solution
-        logger.info("Verifying solution...")
-        verification_result = verify_solution(solution, config, shifts)
-        
-        if not verification_result.is_valid:
-            logger.error("Solution verification failed! Check the errors above.")
-            if args.log_level == "DEBUG":
-                print_verification_report(verification_result)
+        # Verify solution; the solver status is trusted unless asked otherwise
+        if args.verify or args.log_level == "DEBUG":
+            logger.info("Verifying solution...")
+            verification_result = verify_solution(solution, config, shifts)
+            
+            if not verification_result.is_valid:
+                logger.error("Solution verification failed! Check the errors above.")
+                if args.log_level == "DEBUG":
+                    print_verification_report(verification_result)
         
         # Export solution
-        logger.info(f"Exporting solution to: {args.output}")
+        logger.info("Exporting solution to: %s", args.output)
         export_solution(solution, config, shifts, args.output)
         
         # Generate validation report if requested
         if args.validate:
             validation_output = args.output.parent / f"validation_{args.output.stem}.xlsx"
-            logger.info(f"Generating validation report: {validation_output}")
+            logger.info("Generating validation report: %s", validation_output)
             
-            validation_df = create_detailed_validation_report(solution, config, shifts)
-            with pd.ExcelWriter(validation_output, engine='openpyxl') as writer:
-                validation_df.to_excel(writer, sheet_name='ValidationReport', index=False)
+            export_validation_report(iter_validation_rows(solution, config, shifts), validation_output)
             
             logger.info("Validation report generated")
         
@@ -169,10 +300,10 @@ def main():
         return 0
         
     except FileNotFoundError as e:
-        logger.error(f"File not found: {e}")
+        logger.error("File not found: %s", e)
         return 1
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         logger.exception("Full traceback:")
         return 1
 
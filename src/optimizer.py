@@ -1,18 +1,21 @@
+import os
+import logging
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from types import MappingProxyType
+from typing import List, Dict, Iterable, Tuple, Optional
 import calendar
 from datetime import date, timedelta
 from ortools.sat.python import cp_model
 
 try:
     from .config_loader import Config, Employee, Post
-    from .shift_generator import Shift, calculate_night_hours, get_shifts_with_conflicts
+    from .shift_generator import Shift, calculate_night_hours, get_conflict_cliques
 except ImportError:
     from config_loader import Config, Employee, Post
-    from shift_generator import Shift, calculate_night_hours, get_shifts_with_conflicts
+    from shift_generator import Shift, calculate_night_hours, get_conflict_cliques
 
 
-@dataclass
+@dataclass(slots=True)
 class Solution:
     assignments: Dict[str, str]  # shift_id -> emp_id
     active_employees: List[str]
@@ -25,23 +28,96 @@ class Solution:
 
 
 class ShiftOptimizer:
-    def __init__(self, config: Config, shifts: List[Shift]):
+    # Lexicographic levels solved together keep their weighted objective
+    # below 2**53, so it stays exact in the doubles CP-SAT's LP works with
+    MAX_MERGED_OBJECTIVE = 2 ** 53
+    
+    # Metrics after hours_to_work of an employee left without shifts
+    # (read-only: its values are unpacked into every result)
+    INACTIVE_METRICS = MappingProxyType({
+        'hours_night': 0,
+        'hours_holiday': 0,
+        'hours_sunday': 0,
+        'num_sundays': 0,
+        'he_hours': 0,
+        'rf_hours_applied': 0,
+        'val_rn': 0,
+        'val_rf': 0,
+        'val_he': 0,
+        'salary_base': 0,
+        'total_employee': 0
+    })
+    
+    def __init__(self, config: Config, shifts: List[Shift], solver_params: Optional[Dict] = None,
+                 merge_levels: Optional[bool] = None, level_gap_limit: Optional[float] = None):
+        """
+        Build the CP-SAT model for the given configuration and shifts.
+        
+        Args:
+            config: Loaded configuration
+            shifts: Shifts to cover
+            solver_params: Extra CP-SAT parameters applied over the defaults,
+                e.g. {"cp_model_probing_level": 2}
+            merge_levels: Solve consecutive lexicographic levels as one
+                weighted objective where it stays exact. Saves solver restarts
+                on small instances, but the large weights make the search
+                slower on bigger ones. Defaults to the SOLVER_MERGE_LEVELS
+                environment variable (1 to enable), off if unset
+            level_gap_limit: Relative optimality gap accepted on every
+                lexicographic level but the last. Such a level is then bounded
+                by the solution found instead of its proven optimum, so the
+                earlier priorities may end up to that fraction above their
+                optimum in exchange for a shorter solve. Defaults to the
+                SOLVER_LEVEL_GAP_LIMIT environment variable, 0 (exact) if unset
+        """
         self.config = config
+        if merge_levels is None:
+            merge_levels = bool(int(os.environ.get("SOLVER_MERGE_LEVELS", 0)))
+        self.merge_levels = merge_levels
+        if level_gap_limit is None:
+            level_gap_limit = float(os.environ.get("SOLVER_LEVEL_GAP_LIMIT", 0.0))
+        self.level_gap_limit = level_gap_limit
         self.shifts = shifts
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
         
-        # Configure solver timeout (3 minutes = 180 seconds)
-        self.solver.parameters.max_time_in_seconds = 180.0
-        self.solver.parameters.log_search_progress = False  # Reduce verbose output
+        # Configure solver timeout per solve (3 minutes = 180 seconds unless overridden)
+        self.solver.parameters.max_time_in_seconds = float(os.environ.get("SOLVER_TIME_LIMIT", 180.0))
+        # Parallel portfolio search, one CP-SAT worker per core unless overridden
+        self.solver.parameters.num_workers = int(os.environ.get("SOLVER_NUM_WORKERS", os.cpu_count() or 8))
+        # Print the search log and name the model variables only when debugging;
+        # thousands of name strings otherwise just bloat the model proto
+        self.debug = logging.getLogger(__name__).isEnabledFor(logging.DEBUG)
+        self.solver.parameters.log_search_progress = self.debug
+        # Full LP relaxation: the hour sums and cost objectives give it real
+        # bounds, which cut the slower lexicographic levels several times over
+        self.solver.parameters.linearization_level = 2
+        for name, value in (solver_params or {}).items():
+            setattr(self.solver.parameters, name, value)
         
         # Create indices
-        self.employees = {emp.emp_id: emp for emp in config.employees}
-        self.posts = {post.post_id: post for post in config.posts}
+        self.employees = config.employees_by_id
+        self.posts = config.posts_by_id
         self.shifts_by_id = {shift.shift_id: shift for shift in shifts}
+        self.shifts_by_post = {}
+        self.shifts_by_date = {}
+        for shift in shifts:
+            self.shifts_by_post.setdefault(shift.post_id, []).append(shift)
+            self.shifts_by_date.setdefault(shift.date, []).append(shift)
+        self.sundays = self._get_sundays()
+        
+        # Employees cheapest first: FIJOS grouped by their post, and COMODINES
+        self.fijos_by_post = {}
+        self.comodines = []
+        for emp_id, emp in sorted(self.employees.items(), key=lambda item: item[1].salario_contrato):
+            if emp.tipo == "FIJO":
+                self.fijos_by_post.setdefault(emp.asignado_post_id, []).append(emp_id)
+            elif emp.tipo == "COMODIN":
+                self.comodines.append(emp_id)
         
         # Calculate derived data
         self._calculate_employee_data()
+        self._calculate_valid_shifts()
         self._calculate_shift_conflicts()
         
         # Variables
@@ -64,118 +140,132 @@ class ShiftOptimizer:
     
     def _calculate_employee_data(self):
         """Calculate derived data for each employee."""
-        year = self.config.global_config.year
-        month = self.config.global_config.month
-        days_in_month = calendar.monthrange(year, month)[1]
+        global_config = self.config.global_config
+        days_in_month = calendar.monthrange(global_config.year, global_config.month)[1]
+        
+        # Calculate hours to work (assuming full month availability)
+        hours_to_work = (global_config.hours_per_week / 7) * days_in_month
+        hours_to_work_centihours = int(hours_to_work * 100)
         
         self.employee_data = {}
         for emp_id, emp in self.employees.items():
             # Calculate salary per hour
-            salary_per_hour = emp.salario_contrato / self.config.global_config.hours_base_month
-            
-            # Calculate hours to work (assuming full month availability)
-            hours_to_work = (self.config.global_config.hours_per_week / 7) * days_in_month
+            salary_per_hour = emp.salario_contrato / global_config.hours_base_month
             
             self.employee_data[emp_id] = {
                 'salary_per_hour': salary_per_hour,
+                # Integer Sunday (RF) cost of one centihour, as used by the objectives
+                'sunday_cost_per_centihour': int(salary_per_hour * global_config.rf_pct / 100),
                 'hours_to_work': hours_to_work,
+                'hours_to_work_centihours': hours_to_work_centihours,
                 'linked_days': days_in_month,  # Assuming no disconnections
                 'vacation_days': 0  # Assuming no vacations
             }
     
+    def _calculate_valid_shifts(self):
+        """Calculate the shifts each employee can be assigned to, in shift order."""
+        self.valid_shifts = {}
+        for emp_id, emp in self.employees.items():
+            if emp.tipo == "FIJO":
+                # Fixed employees can only work in their assigned post
+                self.valid_shifts[emp_id] = self.shifts_by_post.get(emp.asignado_post_id, [])
+            else:
+                # Comodins can work in any post
+                self.valid_shifts[emp_id] = self.shifts
+    
     def _calculate_shift_conflicts(self):
-        """Calculate which shifts conflict due to consecutive shift rules."""
-        self.shift_conflicts = get_shifts_with_conflicts(
-            self.shifts, 
-            0  # min_rest_hours no longer used - simplified consecutive rule
-        )
+        """Calculate the groups of shifts that conflict due to consecutive shift rules."""
+        self.conflict_cliques = get_conflict_cliques(self.shifts)
     
     def _create_variables(self):
         """Create all optimization variables."""
+        named = self.debug
         
-        # Assignment variables x[emp_id, shift_id]
+        # Assignment variables x[emp_id, shift_id], only for valid assignments
         for emp_id in self.employees:
-            for shift in self.shifts:
-                # Check if assignment is valid
-                if self._is_valid_assignment(emp_id, shift):
-                    var_name = f"x_{emp_id}_{shift.shift_id}"
-                    self.x[emp_id, shift.shift_id] = self.model.NewBoolVar(var_name)
+            for shift in self.valid_shifts[emp_id]:
+                var_name = f"x_{emp_id}_{shift.shift_id}" if named else ""
+                self.x[emp_id, shift.shift_id] = self.model.NewBoolVar(var_name)
+        
+        # Assignment variables of each employee, aligned with valid_shifts so
+        # that the per-employee loops need no x lookups, and of each shift, in
+        # employee order. Built from self.x so that shifts sharing an ID share
+        # its single variable.
+        self.x_by_emp = {
+            emp_id: [self.x[emp_id, shift.shift_id] for shift in self.valid_shifts[emp_id]]
+            for emp_id in self.employees
+        }
+        self.x_by_shift = {shift.shift_id: [] for shift in self.shifts}
+        for (emp_id, shift_id), var in self.x.items():
+            self.x_by_shift[shift_id].append(var)
         
         # Active employee variables
         for emp_id in self.employees:
-            self.active[emp_id] = self.model.NewBoolVar(f"active_{emp_id}")
+            self.active[emp_id] = self.model.NewBoolVar(f"active_{emp_id}" if named else "")
         
-        # Comodin-post assignment variables
+        # Comodin-post assignment variables, for the posts that have shifts
         for emp_id, emp in self.employees.items():
             if emp.tipo == "COMODIN":
                 for post_id in self.posts:
-                    var_name = f"z_{emp_id}_{post_id}"
+                    if post_id not in self.shifts_by_post:
+                        continue
+                    var_name = f"z_{emp_id}_{post_id}" if named else ""
                     self.z[emp_id, post_id] = self.model.NewBoolVar(var_name)
         
         # Sunday worked variables
-        sundays = self._get_sundays()
+        sundays = self.sundays
         for emp_id in self.employees:
             for sunday in sundays:
-                date_str = sunday.strftime('%Y%m%d')
-                var_name = f"sunday_{emp_id}_{date_str}"
+                var_name = f"sunday_{emp_id}_{sunday.strftime('%Y%m%d')}" if named else ""
                 self.sunday_worked[emp_id, sunday] = self.model.NewBoolVar(var_name)
         
-        # Excess sundays indicator
+        # Excess sundays indicator, only for employees with more workable
+        # Sundays than the threshold; for the rest it could only be 0
+        sunday_dates = set(sundays)
+        threshold = self.config.global_config.sunday_threshold
         for emp_id in self.employees:
-            var_name = f"excess_sundays_{emp_id}"
+            workable_sundays = {shift.date for shift in self.valid_shifts[emp_id] if shift.date in sunday_dates}
+            if len(workable_sundays) <= threshold:
+                continue
+            var_name = f"excess_sundays_{emp_id}" if named else ""
             self.excess_sundays[emp_id] = self.model.NewBoolVar(var_name)
         
         # Continuous variables for hours and costs
+        shift_length_hours = self.config.global_config.shift_length_hours
         for emp_id in self.employees:
-            emp = self.employees[emp_id]
-            
             # Calculate realistic max hours for this specific employee
-            if emp.tipo == "FIJO":
-                # FIJO employee can only work shifts from their assigned post
-                employee_shifts = [s for s in self.shifts if s.post_id == emp.asignado_post_id]
-            else:
-                # COMODIN can work any shift, but still limited by time conflicts
-                employee_shifts = self.shifts
-            
-            max_hours_for_employee = len(employee_shifts) * self.config.global_config.shift_length_hours
+            # (COMODINES can work any shift, but are still limited by time conflicts)
+            max_hours_for_employee = len(self.valid_shifts[emp_id]) * shift_length_hours
             max_centihours_for_employee = max_hours_for_employee * 100
             
             # Hours assigned (keep in hours)
-            self.hours_assigned[emp_id] = self.model.NewIntVar(0, max_hours_for_employee, f"hours_assigned_{emp_id}")
+            self.hours_assigned[emp_id] = self.model.NewIntVar(0, max_hours_for_employee, f"hours_assigned_{emp_id}" if named else "")
             # Special hour types in centihours for precision
-            self.hours_night[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_night_{emp_id}")
-            self.hours_holiday[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_holiday_{emp_id}")
-            self.hours_sunday[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_sunday_{emp_id}")
+            self.hours_night[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_night_{emp_id}" if named else "")
+            self.hours_holiday[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_holiday_{emp_id}" if named else "")
+            self.hours_sunday[emp_id] = self.model.NewIntVar(0, max_centihours_for_employee, f"hours_sunday_{emp_id}" if named else "")
             
-            # Overtime hours in centihours
+            # Overtime hours in centihours, for employees whose shifts can exceed
+            # their hours to work
             max_he_centihours = max(0, int((max_hours_for_employee - self.employee_data[emp_id]['hours_to_work']) * 100))
-            self.he_hours[emp_id] = self.model.NewIntVar(0, max_he_centihours, f"he_hours_{emp_id}")
-            self.has_he[emp_id] = self.model.NewBoolVar(f"has_he_{emp_id}")
+            if max_he_centihours == 0:
+                continue
+            self.he_hours[emp_id] = self.model.NewIntVar(0, max_he_centihours, f"he_hours_{emp_id}" if named else "")
+            self.has_he[emp_id] = self.model.NewBoolVar(f"has_he_{emp_id}" if named else "")
     
-    def _is_valid_assignment(self, emp_id: str, shift: Shift) -> bool:
-        """Check if an employee can be assigned to a shift."""
-        emp = self.employees[emp_id]
-        
-        # Fixed employees can only work in their assigned post
-        if emp.tipo == "FIJO":
-            return shift.post_id == emp.asignado_post_id
-        
-        # Comodins can work in any post
-        return True
+    def _comodin_max_posts(self, emp: Employee) -> int:
+        """Posts a COMODIN may work in: its own max_posts_if_comodin, else the global limit."""
+        return emp.max_posts_if_comodin if emp.max_posts_if_comodin > 0 else self.config.global_config.max_posts_per_comodin
     
     def _get_sundays(self) -> List[date]:
         """Get all Sunday dates in the month."""
         year = self.config.global_config.year
         month = self.config.global_config.month
-        days_in_month = calendar.monthrange(year, month)[1]
+        first_weekday, days_in_month = calendar.monthrange(year, month)
         
-        sundays = []
-        for day in range(1, days_in_month + 1):
-            current_date = date(year, month, day)
-            if current_date.weekday() == 6:  # Sunday
-                sundays.append(current_date)
-        
-        return sundays
+        # Sunday is weekday 6; step through the month a week at a time
+        first_sunday = 1 + (6 - first_weekday) % 7
+        return [date(year, month, day) for day in range(first_sunday, days_in_month + 1, 7)]
     
     def _find_sunday_champions(self) -> Dict[str, str]:
         """
@@ -189,31 +279,17 @@ class ShiftOptimizer:
         """
         champions = {}
         
-        # Champion per post (FIJO employees only)
+        # Champion per post (cheapest FIJO employee)
         for post_id in self.posts:
-            fixed_employees = [
-                emp_id for emp_id, emp in self.employees.items()
-                if emp.tipo == "FIJO" and emp.asignado_post_id == post_id
-            ]
-            
-            if fixed_employees:
-                # Find cheapest FIJO employee for this post
-                post_champion = min(fixed_employees, key=lambda emp_id: self.employees[emp_id].salario_contrato)
-                champions[f"Post {post_id}"] = post_champion
+            if post_id in self.fijos_by_post:
+                champions[f"Post {post_id}"] = self.fijos_by_post[post_id][0]
         
-        # Global champion (COMODIN employees - can work anywhere)
-        comodin_employees = [
-            emp_id for emp_id, emp in self.employees.items()
-            if emp.tipo == "COMODIN"
-        ]
-        
-        if comodin_employees:
-            # Find cheapest COMODIN employee
-            global_champion = min(comodin_employees, key=lambda emp_id: self.employees[emp_id].salario_contrato)
-            champions["Global"] = global_champion
+        # Global champion (cheapest COMODIN employee - can work anywhere)
+        if self.comodines:
+            champions["Global"] = self.comodines[0]
         
         # If no COMODINES, find the overall cheapest employee as backup global champion
-        if not comodin_employees and champions:
+        if not self.comodines and champions:
             # From existing post champions, find the absolute cheapest
             all_post_champions = list(champions.values())
             global_champion = min(all_post_champions, key=lambda emp_id: self.employees[emp_id].salario_contrato)
@@ -243,44 +319,32 @@ class ShiftOptimizer:
         
         # Analyze each post with FIJO employees
         for post_id in self.posts:
-            fixed_employees = [
-                emp_id for emp_id, emp in self.employees.items()
-                if emp.tipo == "FIJO" and emp.asignado_post_id == post_id
-            ]
+            # Already sorted by salary (cheapest first)
+            fixed_sorted = self.fijos_by_post.get(post_id, [])
             
-            if len(fixed_employees) >= 3:  # Normal case: 3+ FIJOS
-                # Sort by salary (cheapest first)
-                fixed_sorted = sorted(fixed_employees, key=lambda emp_id: self.employees[emp_id].salario_contrato)
-                
+            if len(fixed_sorted) >= 3:  # Normal case: 3+ FIJOS
                 roles[post_id] = {
                     'champion': fixed_sorted[0],  # Cheapest takes most Sundays
                     'helper': fixed_sorted[1],    # 2nd cheapest helps (≤2 Sundays)
                     'others': fixed_sorted[2:]    # Rest avoid Sundays
                 }
                 
-            elif len(fixed_employees) == 2:  # Special case: only 2 FIJOS
-                fixed_sorted = sorted(fixed_employees, key=lambda emp_id: self.employees[emp_id].salario_contrato)
+            elif len(fixed_sorted) == 2:  # Special case: only 2 FIJOS
                 roles[post_id] = {
                     'champion': fixed_sorted[0],  # Cheapest takes more
                     'helper': fixed_sorted[1]     # 2nd one helps
                 }
                 
-            elif len(fixed_employees) == 1:  # Edge case: only 1 FIJO
+            elif len(fixed_sorted) == 1:  # Edge case: only 1 FIJO
                 roles[post_id] = {
-                    'champion': fixed_employees[0]  # Must take all Sundays
+                    'champion': fixed_sorted[0]  # Must take all Sundays
                 }
         
         # COMODINES: Strategic relief workers
-        comodin_employees = [
-            emp_id for emp_id, emp in self.employees.items()
-            if emp.tipo == "COMODIN"
-        ]
-        
-        if comodin_employees:
-            # Sort COMODINES by salary (cheapest first for relief work)
-            comodines_sorted = sorted(comodin_employees, key=lambda emp_id: self.employees[emp_id].salario_contrato)
+        if self.comodines:
+            # COMODINES sorted by salary (cheapest first for relief work)
             roles["COMODINES"] = {
-                'employees': comodines_sorted
+                'employees': self.comodines
             }
         
         return roles
@@ -312,17 +376,14 @@ class ShiftOptimizer:
             
             if 'champion' in post_roles and post_roles['champion'] == emp_id:
                 # Champion SHOULD take excess Sundays - lowest possible penalty
-                print(f"      🏆 Champion {emp_id}: Weight 1 (WANTS excess Sundays)")
                 return 1
                 
             elif 'helper' in post_roles and post_roles['helper'] == emp_id:
                 # Helper can help but should be discouraged from excess
-                print(f"      🤝 Helper {emp_id}: Weight 50 (moderate excess OK)")
                 return 50
                 
             elif 'others' in post_roles and emp_id in post_roles['others']:
                 # Others should NEVER have excess Sundays - BRUTAL penalty
-                print(f"      🚫 Other {emp_id}: Weight 10000 (NO excess allowed)")
                 return 10000
         
         # Default: high penalty
@@ -332,180 +393,119 @@ class ShiftOptimizer:
         """Create all optimization constraints."""
         
         # 1. Coverage constraints - each shift must have exactly one employee
-        shifts_by_post = {}
-        for shift in self.shifts:
-            if shift.post_id not in shifts_by_post:
-                shifts_by_post[shift.post_id] = []
-            shifts_by_post[shift.post_id].append(shift)
-        
-        for post_id, post_shifts in shifts_by_post.items():
+        for post_id, post_shifts in self.shifts_by_post.items():
             required_coverage = self.posts[post_id].required_coverage
             for shift in post_shifts:
-                assigned_employees = []
-                for emp_id in self.employees:
-                    if (emp_id, shift.shift_id) in self.x:
-                        assigned_employees.append(self.x[emp_id, shift.shift_id])
+                assigned_employees = self.x_by_shift[shift.shift_id]
                 
-                if assigned_employees:
-                    self.model.Add(sum(assigned_employees) == required_coverage)
+                if not assigned_employees:
+                    continue
+                if required_coverage == 1:
+                    self.model.AddExactlyOne(assigned_employees)
+                else:
+                    self.model.Add(cp_model.LinearExpr.Sum(assigned_employees) == required_coverage)
         
-        # 2. Employee activation constraints
+        # 2. Employee activation constraints: active[emp_id] = 1 iff any shift is worked
         for emp_id in self.employees:
-            for shift in self.shifts:
-                if (emp_id, shift.shift_id) in self.x:
-                    self.model.Add(self.x[emp_id, shift.shift_id] <= self.active[emp_id])
+            emp_assignments = self.x_by_emp[emp_id]
+            if emp_assignments:
+                self.model.AddMaxEquality(self.active[emp_id], emp_assignments)
         
         # 3. Minimum rest and conflict constraints
-        for shift_id1, shift_id2 in self.shift_conflicts:
-            shift1 = self.shifts_by_id[shift_id1]
-            shift2 = self.shifts_by_id[shift_id2]
-            
+        for clique in self.conflict_cliques:
             for emp_id in self.employees:
-                emp = self.employees[emp_id]
-                
-                # Only apply conflict constraint if employee can potentially work both shifts
-                can_work_shift1 = self._is_valid_assignment(emp_id, shift1)
-                can_work_shift2 = self._is_valid_assignment(emp_id, shift2)
-                
-                if can_work_shift1 and can_work_shift2:
-                    vars_to_constrain = []
-                    if (emp_id, shift_id1) in self.x:
-                        vars_to_constrain.append(self.x[emp_id, shift_id1])
-                    if (emp_id, shift_id2) in self.x:
-                        vars_to_constrain.append(self.x[emp_id, shift_id2])
-                    
-                    if len(vars_to_constrain) == 2:
-                        self.model.Add(sum(vars_to_constrain) <= 1)
+                # Only the shifts of the group this employee can potentially work
+                clique_assignments = [
+                    self.x[emp_id, shift.shift_id] for shift in clique
+                    if (emp_id, shift.shift_id) in self.x
+                ]
+                if len(clique_assignments) > 1:
+                    self.model.AddAtMostOne(clique_assignments)
         
         # 4. Minimum fixed employees per post
-        for post_id, post in self.posts.items():
-            fixed_employees_for_post = [
-                emp_id for emp_id, emp in self.employees.items()
-                if emp.tipo == "FIJO" and emp.asignado_post_id == post_id
-            ]
-            
-            if len(fixed_employees_for_post) < self.config.global_config.min_fixed_per_post:
-                raise ValueError(f"Post {post_id} has only {len(fixed_employees_for_post)} fixed employees, minimum required is {self.config.global_config.min_fixed_per_post}")
+        min_fixed_per_post = self.config.global_config.min_fixed_per_post
+        for post_id in self.posts:
+            fixed_count = len(self.fijos_by_post.get(post_id, []))
+            if fixed_count < min_fixed_per_post:
+                raise ValueError(f"Post {post_id} has only {fixed_count} fixed employees, minimum required is {min_fixed_per_post}")
         
         # 5. Comodin post limits
         for emp_id, emp in self.employees.items():
             if emp.tipo == "COMODIN":
-                # Prioritize individual max_posts_if_comodin, fallback to global max_posts_per_comodin
-                max_posts = emp.max_posts_if_comodin if emp.max_posts_if_comodin > 0 else self.config.global_config.max_posts_per_comodin
-                comodin_posts = [self.z[emp_id, post_id] for post_id in self.posts]
-                self.model.Add(sum(comodin_posts) <= max_posts)
+                max_posts = self._comodin_max_posts(emp)
+                comodin_posts = [self.z[emp_id, post_id] for post_id in self.posts if (emp_id, post_id) in self.z]
+                self.model.Add(cp_model.LinearExpr.Sum(comodin_posts) <= max_posts)
                 
                 # Link z variables to x variables
                 for post_id in self.posts:
-                    post_shifts = [shift for shift in self.shifts if shift.post_id == post_id]
-                    post_assignments = []
-                    for shift in post_shifts:
-                        if (emp_id, shift.shift_id) in self.x:
-                            post_assignments.append(self.x[emp_id, shift.shift_id])
-                    
-                    if post_assignments:
-                        # z[emp_id, post_id] >= any x[emp_id, shift] for shifts in post
-                        for assignment in post_assignments:
-                            self.model.Add(self.z[emp_id, post_id] >= assignment)
+                    if (emp_id, post_id) in self.z:
+                        post_assignments = [
+                            self.x[emp_id, shift.shift_id] for shift in self.shifts_by_post[post_id]
+                        ]
                         
-                        # z[emp_id, post_id] <= sum of all x[emp_id, shift] for shifts in post
-                        self.model.Add(self.z[emp_id, post_id] * len(post_assignments) >= sum(post_assignments))
+                        # z[emp_id, post_id] = 1 iff any x[emp_id, shift] for shifts in post
+                        self.model.AddMaxEquality(self.z[emp_id, post_id], post_assignments)
         
         # 6. Sunday tracking constraints
-        sundays = self._get_sundays()
-        for emp_id in self.employees:
+        sundays = self.sundays
+        sunday_shifts_by_post = {sunday: {} for sunday in sundays}
+        for sunday in sundays:
+            for shift in self.shifts_by_date.get(sunday, []):
+                sunday_shifts_by_post[sunday].setdefault(shift.post_id, []).append(shift)
+        
+        for emp_id, emp in self.employees.items():
             for sunday in sundays:
-                sunday_shifts = [shift for shift in self.shifts if shift.date == sunday]
-                sunday_assignments = []
-                for shift in sunday_shifts:
-                    if (emp_id, shift.shift_id) in self.x:
-                        sunday_assignments.append(self.x[emp_id, shift.shift_id])
+                # Same rule as valid_shifts: FIJOS only work their own post
+                if emp.tipo == "FIJO":
+                    sunday_shifts = sunday_shifts_by_post[sunday].get(emp.asignado_post_id, [])
+                else:
+                    sunday_shifts = self.shifts_by_date.get(sunday, [])
+                sunday_assignments = [self.x[emp_id, shift.shift_id] for shift in sunday_shifts]
                 
                 if sunday_assignments:
-                    # Link sunday_worked to actual assignments
-                    for assignment in sunday_assignments:
-                        self.model.Add(self.sunday_worked[emp_id, sunday] >= assignment)
-                    
-                    self.model.Add(
-                        self.sunday_worked[emp_id, sunday] * len(sunday_assignments) >= 
-                        sum(sunday_assignments)
-                    )
+                    # Link sunday_worked to actual assignments: 1 iff any is worked
+                    self.model.AddMaxEquality(self.sunday_worked[emp_id, sunday], sunday_assignments)
         
         # 7. Excess sundays tracking
         threshold = self.config.global_config.sunday_threshold
-        for emp_id in self.employees:
+        for emp_id in self.excess_sundays:
             sundays_worked = [self.sunday_worked[emp_id, sunday] for sunday in sundays]
             if sundays_worked:
-                # excess_sundays[emp_id] = 1 if sum(sundays_worked) > threshold
-                self.model.Add(sum(sundays_worked) <= threshold + len(sundays) * self.excess_sundays[emp_id])
-                self.model.Add(sum(sundays_worked) >= (threshold + 1) * self.excess_sundays[emp_id])
+                # excess_sundays[emp_id] = 1 iff sum(sundays_worked) > threshold
+                total_sundays_worked = cp_model.LinearExpr.Sum(sundays_worked)
+                self.model.Add(total_sundays_worked > threshold).OnlyEnforceIf(self.excess_sundays[emp_id])
+                self.model.Add(total_sundays_worked <= threshold).OnlyEnforceIf(self.excess_sundays[emp_id].Not())
         
         # 8. Hours calculation constraints
+        # Each sum is built in one call; WeightedSum drops zero coefficients
         for emp_id in self.employees:
-            # Total hours assigned
-            total_hours_expr = []
-            night_hours_expr = []
-            holiday_hours_expr = []
-            sunday_hours_expr = []
-            
-            for shift in self.shifts:
-                if (emp_id, shift.shift_id) in self.x:
-                    # Total hours (unchanged)
-                    total_hours_expr.append(self.x[emp_id, shift.shift_id] * shift.duration_hours)
-                    
-                    # Calculate actual night hours from hours_by_day (convert to centihours for integer math)
-                    shift_night_hours = sum(day_hours.night_hours for day_hours in shift.hours_by_day.values())
-                    if shift_night_hours > 0:
-                        night_hours_expr.append(self.x[emp_id, shift.shift_id] * int(shift_night_hours * 100))
-                    
-                    # Calculate actual holiday hours from hours_by_day (convert to centihours)
-                    shift_holiday_hours = sum(day_hours.total_hours for day_hours in shift.hours_by_day.values() if day_hours.is_holiday)
-                    if shift_holiday_hours > 0:
-                        holiday_hours_expr.append(self.x[emp_id, shift.shift_id] * int(shift_holiday_hours * 100))
-                    
-                    # Calculate actual Sunday hours from hours_by_day (convert to centihours)
-                    shift_sunday_hours = sum(day_hours.total_hours for day_hours in shift.hours_by_day.values() if day_hours.is_sunday)
-                    if shift_sunday_hours > 0:
-                        sunday_hours_expr.append(self.x[emp_id, shift.shift_id] * int(shift_sunday_hours * 100))
-            
-            if total_hours_expr:
-                self.model.Add(self.hours_assigned[emp_id] == sum(total_hours_expr))
-            else:
-                self.model.Add(self.hours_assigned[emp_id] == 0)
-            
-            if night_hours_expr:
-                self.model.Add(self.hours_night[emp_id] == sum(night_hours_expr))
-            else:
-                self.model.Add(self.hours_night[emp_id] == 0)
+            shifts = self.valid_shifts[emp_id]
+            assignments = self.x_by_emp[emp_id]
             
-            if holiday_hours_expr:
-                self.model.Add(self.hours_holiday[emp_id] == sum(holiday_hours_expr))
-            else:
-                self.model.Add(self.hours_holiday[emp_id] == 0)
+            # Total hours assigned
+            self.model.Add(self.hours_assigned[emp_id] == cp_model.LinearExpr.WeightedSum(
+                assignments, [shift.duration_hours for shift in shifts]))
             
-            if sunday_hours_expr:
-                self.model.Add(self.hours_sunday[emp_id] == sum(sunday_hours_expr))
-            else:
-                self.model.Add(self.hours_sunday[emp_id] == 0)
+            # Night, holiday and Sunday hours are precomputed per shift in centihours
+            self.model.Add(self.hours_night[emp_id] == cp_model.LinearExpr.WeightedSum(
+                assignments, [shift.night_centihours for shift in shifts]))
+            self.model.Add(self.hours_holiday[emp_id] == cp_model.LinearExpr.WeightedSum(
+                assignments, [shift.holiday_centihours for shift in shifts]))
+            self.model.Add(self.hours_sunday[emp_id] == cp_model.LinearExpr.WeightedSum(
+                assignments, [shift.sunday_centihours for shift in shifts]))
             
             # Overtime calculation (use centihours for precision)
-            hours_to_work_centihours = int(self.employee_data[emp_id]['hours_to_work'] * 100)
+            hours_to_work_centihours = self.employee_data[emp_id]['hours_to_work_centihours']
             hours_assigned_centihours = self.hours_assigned[emp_id] * 100
+            if emp_id not in self.he_hours:
+                # No overtime variable: the assigned hours must stay within hours to work
+                self.model.Add(hours_assigned_centihours <= hours_to_work_centihours)
+                continue
             self.model.Add(self.he_hours[emp_id] >= hours_assigned_centihours - hours_to_work_centihours)
-            self.model.Add(self.he_hours[emp_id] >= 0)
             
-            # Has overtime indicator
-            # Calculate big_m based on the actual max bound of the HE variable
-            emp = self.employees[emp_id]
-            if emp.tipo == "FIJO":
-                employee_shifts = [s for s in self.shifts if s.post_id == emp.asignado_post_id]
-            else:
-                employee_shifts = self.shifts
-            max_hours_for_employee = len(employee_shifts) * self.config.global_config.shift_length_hours
-            max_he_for_employee = max(0, int((max_hours_for_employee - self.employee_data[emp_id]['hours_to_work']) * 100))
-            big_m = max_he_for_employee if max_he_for_employee > 0 else 1000
-            self.model.Add(self.he_hours[emp_id] <= big_m * self.has_he[emp_id])
-            self.model.Add(self.he_hours[emp_id] >= self.has_he[emp_id])
+            # Has overtime indicator: has_he[emp_id] = 1 iff he_hours > 0
+            self.model.Add(self.he_hours[emp_id] >= 1).OnlyEnforceIf(self.has_he[emp_id])
+            self.model.Add(self.he_hours[emp_id] == 0).OnlyEnforceIf(self.has_he[emp_id].Not())
     
     def solve_lexicographic(self, sunday_strategy: str = "smart", random_seed: int = 42) -> Solution:
         """Solve using lexicographic optimization strategy."""
@@ -514,62 +514,31 @@ class ShiftOptimizer:
         self.solver.parameters.random_seed = random_seed
         print(f"🎲 Using random seed: {random_seed}")
         
-        # Level 1: Minimize total overtime hours and employees with overtime
-        print("Optimizing Level 1: Overtime...")
-        
-        # Minimize total HE hours
-        total_he = sum(self.he_hours[emp_id] for emp_id in self.employees)
-        self.model.Minimize(total_he)
-        
-        status = self.solver.Solve(self.model)
-        if status == cp_model.UNKNOWN:
-            print("Warning: Level 1 reached timeout, using partial solution...")
-        elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 1 failed")
-        
-        # Fix the overtime constraint for next level
-        optimal_he = self.solver.Value(total_he)
-        self.model.Add(total_he <= optimal_he)
-        
-        # Level 1b: Minimize number of employees with overtime
-        total_has_he = sum(self.has_he[emp_id] for emp_id in self.employees)
-        self.model.Minimize(total_has_he)
-        
-        status = self.solver.Solve(self.model)
-        if status == cp_model.UNKNOWN:
-            print("Warning: Level 1b reached timeout, using partial solution...")
-        elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 1b failed")
-        
-        optimal_has_he = self.solver.Value(total_has_he)
-        self.model.Add(total_has_he <= optimal_has_he)
+        # Level 1: Minimize total overtime hours, then employees with overtime
+        total_he = cp_model.LinearExpr.Sum(list(self.he_hours.values()))
+        total_has_he = cp_model.LinearExpr.Sum(list(self.has_he.values()))
         
         # Level 2: Minimize holiday surcharge (total RF hours)
-        print("Optimizing Level 2: Holiday surcharge...")
-        
         # Minimize total RF hours (holiday + conditional Sunday hours)
         # This is more complex because RF hours depend on Sunday count, but we can approximate
         # by minimizing: total_holiday_hours + total_sunday_hours
         # The solver will naturally prefer solutions that avoid excess Sunday hours when possible
-        total_rf_hours = (
-            sum(self.hours_holiday[emp_id] for emp_id in self.employees) +
-            sum(self.hours_sunday[emp_id] for emp_id in self.employees)
+        total_rf_hours = cp_model.LinearExpr.Sum(
+            [self.hours_holiday[emp_id] for emp_id in self.employees] +
+            [self.hours_sunday[emp_id] for emp_id in self.employees]
         )
-        self.model.Minimize(total_rf_hours)
         
-        status = self.solver.Solve(self.model)
-        if status == cp_model.UNKNOWN:
-            print("Warning: Level 2 reached timeout, using partial solution...")
-        elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 2 failed")
+        # Total Sunday cost (salary-weighted, in integer units)
+        total_sunday_cost = cp_model.LinearExpr.WeightedSum(
+            [self.hours_sunday[emp_id] for emp_id in self.employees],
+            [self.employee_data[emp_id]['sunday_cost_per_centihour'] for emp_id in self.employees]
+        )
         
-        optimal_rf_hours = self.solver.Value(total_rf_hours)
-        self.model.Add(total_rf_hours <= optimal_rf_hours)
+        total_excess_sundays = cp_model.LinearExpr.Sum(list(self.excess_sundays.values()))
         
-        # Level 2b: Multiple Sunday optimization strategies
+        # Level 2b: Multiple Sunday optimization strategies. Each sets the
+        # objective to minimize and the expression bounded once it is solved
         if sunday_strategy == "smart":
-            print("Optimizing Level 2b: Intelligent Sunday Strategy...")
-            
             # Analyze setup: FIJOS vs COMODINES
             sunday_roles = self._analyze_sunday_roles()
             
@@ -577,50 +546,47 @@ class ShiftOptimizer:
             for post_id, roles in sunday_roles.items():
                 if post_id == "COMODINES":
                     if roles['employees']:
-                        print(f"   COMODINES: {len(roles['employees'])} relief employees")
-                        for emp_id in roles['employees']:
-                            print(f"     - {emp_id} (relief worker)")
+                        print(f"   COMODINES: {roles['employees']} (relief workers, weight 5)")
                 else:
                     print(f"   Post {post_id}:")
                     if 'champion' in roles:
-                        print(f"     Champion: {roles['champion']} (takes most Sundays)")
+                        print(f"     Champion: {roles['champion']} (takes most Sundays, weight 1)")
                     if 'helper' in roles:
-                        print(f"     Helper: {roles['helper']} (≤2 Sundays max)")
+                        print(f"     Helper: {roles['helper']} (≤2 Sundays max, weight 50)")
                     if 'others' in roles:
-                        print(f"     Others: {roles['others']} (minimal Sundays)")
+                        print(f"     Others: {roles['others']} (minimal Sundays, weight 10000)")
             
             # Create intelligent weights based on roles
-            weighted_excess_sundays = []
+            smart_excess_objective = cp_model.LinearExpr.WeightedSum(
+                list(self.excess_sundays.values()),
+                [self._calculate_sunday_weight(emp_id, sunday_roles) for emp_id in self.excess_sundays]
+            )
             
-            for emp_id in self.employees:
-                emp = self.employees[emp_id]
-                weight = self._calculate_sunday_weight(emp_id, sunday_roles)
-                weighted_excess_sundays.append(self.excess_sundays[emp_id] * weight)
+            # Branch the way the roles intend: champions work Sundays, the
+            # other FIJOS stay off them
+            champion_sundays = []
+            other_sundays = []
+            for post_id, roles in sunday_roles.items():
+                if 'champion' in roles:
+                    champion_sundays.extend(self.sunday_worked[roles['champion'], sunday] for sunday in self.sundays)
+                for emp_id in roles.get('others', []):
+                    other_sundays.extend(self.sunday_worked[emp_id, sunday] for sunday in self.sundays)
+            if champion_sundays:
+                self.model.AddDecisionStrategy(champion_sundays, cp_model.CHOOSE_FIRST, cp_model.SELECT_MAX_VALUE)
+            if other_sundays:
+                self.model.AddDecisionStrategy(other_sundays, cp_model.CHOOSE_FIRST, cp_model.SELECT_MIN_VALUE)
             
-            smart_excess_objective = sum(weighted_excess_sundays)
-            self.model.Minimize(smart_excess_objective)
+            level_2b = ("Intelligent Sunday Strategy", smart_excess_objective, smart_excess_objective)
             
         elif sunday_strategy == "balanced":
-            print("Optimizing Level 2b: Balanced Sunday distribution...")
             # Equal penalty for all employees having excess Sundays
-            total_excess_sundays = sum(self.excess_sundays[emp_id] for emp_id in self.employees)
-            self.model.Minimize(total_excess_sundays)
+            level_2b = ("Balanced Sunday distribution", total_excess_sundays, total_excess_sundays)
             
         elif sunday_strategy == "cost_focused":
-            print("Optimizing Level 2b: Cost-focused Sunday optimization...")
-            # Directly minimize Sunday cost (skip to Level 2c logic)
-            sunday_cost_terms = []
-            for emp_id in self.employees:
-                salary_per_hour = self.employee_data[emp_id]['salary_per_hour']
-                rf_cost_per_centihour = salary_per_hour * self.config.global_config.rf_pct / 100
-                sunday_cost = self.hours_sunday[emp_id] * int(rf_cost_per_centihour)
-                sunday_cost_terms.append(sunday_cost)
-            
-            total_sunday_cost = sum(sunday_cost_terms)
-            self.model.Minimize(total_sunday_cost)
+            # Directly minimize Sunday cost (same objective as Level 2c)
+            level_2b = ("Cost-focused Sunday optimization", total_sunday_cost, total_sunday_cost)
             
         elif sunday_strategy == "load_balancing":
-            print("Optimizing Level 2b: Load balancing (equal hours distribution)...")
             # Calculate total hours per employee (assigned hours = total hours worked)
             total_hours_per_emp = []
             for emp_id in self.employees:
@@ -628,17 +594,12 @@ class ShiftOptimizer:
                 total_hours_per_emp.append(self.hours_assigned[emp_id])
             
             # Minimize the maximum total hours worked by any employee
-            max_hours = self.model.NewIntVar(0, 1000, 'max_hours')
-            for total_hours in total_hours_per_emp:
-                self.model.Add(max_hours >= total_hours)
+            max_hours = self.model.NewIntVar(0, 1000, 'max_hours' if self.debug else '')
+            self.model.AddMaxEquality(max_hours, total_hours_per_emp)
             
-            self.model.Minimize(max_hours)
-            
-            # Define total_excess_sundays for later use
-            total_excess_sundays = sum(self.excess_sundays[emp_id] for emp_id in self.employees)
+            level_2b = ("Load balancing (equal hours distribution)", max_hours, total_excess_sundays)
             
         elif sunday_strategy == "surcharge_equity":
-            print("Optimizing Level 2b: Surcharge equity distribution...")
             # Very simplified approach: minimize variance in holiday+night hours only
             # This achieves equity in the most common surcharge types (RF+RN)
             
@@ -649,74 +610,223 @@ class ShiftOptimizer:
                 surcharge_hours_per_emp.append(surcharge_hours)
             
             # Minimize the maximum surcharge hours
-            max_surcharge_hours = self.model.NewIntVar(0, 100000, 'max_surcharge_hours')
-            for surcharge_hours in surcharge_hours_per_emp:
-                self.model.Add(max_surcharge_hours >= surcharge_hours)
-            
-            self.model.Minimize(max_surcharge_hours)
+            max_surcharge_hours = self.model.NewIntVar(0, 100000, 'max_surcharge_hours' if self.debug else '')
+            self.model.AddMaxEquality(max_surcharge_hours, surcharge_hours_per_emp)
             
-            # Define total_excess_sundays for later use
-            total_excess_sundays = sum(self.excess_sundays[emp_id] for emp_id in self.employees)
+            level_2b = ("Surcharge equity distribution", max_surcharge_hours, total_excess_sundays)
             
         else:
             # Default: simple minimize excess employees
-            total_excess_sundays = sum(self.excess_sundays[emp_id] for emp_id in self.employees)
-            self.model.Minimize(total_excess_sundays)
+            level_2b = ("Excess Sundays", total_excess_sundays, total_excess_sundays)
         
-        status = self.solver.Solve(self.model)
-        if status == cp_model.UNKNOWN:
-            print("Warning: Level 2b reached timeout, using partial solution...")
-        elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 2b failed")
+        # Without roles no one is meant to exceed the Sunday threshold, so
+        # branch towards no excess first
+        if sunday_strategy != "smart" and self.excess_sundays:
+            self.model.AddDecisionStrategy(
+                list(self.excess_sundays.values()), cp_model.CHOOSE_FIRST, cp_model.SELECT_MIN_VALUE
+            )
         
-        # Fix the objective value based on strategy
-        if sunday_strategy == "smart":
-            optimal_smart_excess = self.solver.Value(smart_excess_objective)
-            self.model.Add(smart_excess_objective <= optimal_smart_excess)
-        elif sunday_strategy == "cost_focused":
-            optimal_sunday_cost_2b = self.solver.Value(total_sunday_cost)
-            self.model.Add(total_sunday_cost <= optimal_sunday_cost_2b)
-        else:
-            optimal_excess_sundays = self.solver.Value(total_excess_sundays)
-            self.model.Add(total_excess_sundays <= optimal_excess_sundays)
+        # Level 3: Minimize night hours
+        total_night_hours = cp_model.LinearExpr.Sum([self.hours_night[emp_id] for emp_id in self.employees])
+        
+        # (name, description, objective, expression bounded after solving).
+        # Level 3 is the last one, so nothing needs bounding after it
+        levels = [
+            ("Level 1", "Overtime", total_he, total_he),
+            ("Level 1b", "Employees with overtime", total_has_he, total_has_he),
+            ("Level 2", "Holiday surcharge", total_rf_hours, total_rf_hours),
+            ("Level 2b", *level_2b),
+            ("Level 2c", "Minimize total Sunday cost", total_sunday_cost, total_sunday_cost),
+            ("Level 3", "Night hours", total_night_hours, None),
+        ]
         
-        # Level 2c: Minimize total Sunday cost (salary-weighted) for smarter distribution
-        print("Optimizing Level 2c: Minimize total Sunday cost...")
-        sunday_cost_terms = []
-        for emp_id in self.employees:
-            # Calculate cost per centihour for this employee's Sunday work
-            salary_per_hour = self.employee_data[emp_id]['salary_per_hour']
-            rf_cost_per_centihour = salary_per_hour * self.config.global_config.rf_pct / 100
-            
-            # Total Sunday cost for this employee (in integer units)
-            sunday_cost = self.hours_sunday[emp_id] * int(rf_cost_per_centihour)
-            sunday_cost_terms.append(sunday_cost)
+        # Only the last level has to be solved to the configured gap; the
+        # earlier ones merely bound the next
+        self._hint_greedy_assignment()
+        groups = self._group_levels(levels)
+        final_gap_limit = self.solver.parameters.relative_gap_limit
+        for index, group in enumerate(groups):
+            last = index == len(groups) - 1
+            self.solver.parameters.relative_gap_limit = (
+                final_gap_limit if last else max(final_gap_limit, self.level_gap_limit)
+            )
+            status, failed_level = self._solve_levels(group)
+            if failed_level:
+                self.solver.parameters.relative_gap_limit = final_gap_limit
+                return self._create_failed_solution(f"{failed_level} failed")
         
-        total_sunday_cost = sum(sunday_cost_terms)
-        self.model.Minimize(total_sunday_cost)
+        return self._extract_solution(status)
+    
+    def _expression_range(self, expr) -> int:
+        """Width of the range of values expr can take, from its variables' domains."""
+        flat = cp_model.FlatIntExpr(expr)
+        variables = self.model.Proto().variables
+        width = 0
+        for var, coeff in zip(flat.vars, flat.coeffs):
+            # Copied to a list: the proto's repeated field mishandles negative indices
+            domain = list(variables[var.index].domain)
+            width += abs(coeff) * (domain[-1] - domain[0])
+        return width
+    
+    @staticmethod
+    def _level_weights(ranges: List[int]) -> Tuple[List[int], int]:
+        """
+        Weights that make a weighted sum of the levels lexicographic.
         
-        status = self.solver.Solve(self.model)
-        if status == cp_model.UNKNOWN:
-            print("Warning: Level 2c reached timeout, using partial solution...")
-        elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 2c failed")
+        Each level's weight exceeds the largest weighted value all later
+        levels can reach together, so one unit of an earlier level always
+        outweighs them.
         
-        optimal_sunday_cost = self.solver.Value(total_sunday_cost) 
-        self.model.Add(total_sunday_cost <= optimal_sunday_cost)
+        Returns:
+            The weights, and the largest value the weighted sum can reach
+        """
+        weights = []
+        total = 0
+        for width in reversed(ranges):
+            weight = total + 1
+            weights.append(weight)
+            total += weight * width
+        weights.reverse()
+        return weights, total
+    
+    def _group_levels(self, levels: List[Tuple]) -> List[List[Tuple]]:
+        """
+        Split the lexicographic levels into runs solved as one weighted objective.
         
-        # Level 3: Minimize night hours
-        print("Optimizing Level 3: Night hours...")
+        With merge_levels, a level joins the run before it when the run's
+        weighted objective stays within MAX_MERGED_OBJECTIVE, and only if every
+        level of the run is bounded by its own objective afterwards; otherwise
+        the bound would not match what the merged solve optimized. Without it
+        every level is solved on its own.
+        """
+        if not self.merge_levels:
+            return [[level] for level in levels]
+        
+        groups = []
+        ranges = []
+        for level in levels:
+            width = self._expression_range(level[2])
+            if groups and all(objective is bound for _, _, objective, bound in groups[-1]):
+                _, total = self._level_weights(ranges[-1] + [width])
+                if total <= self.MAX_MERGED_OBJECTIVE:
+                    groups[-1].append(level)
+                    ranges[-1].append(width)
+                    continue
+            groups.append([level])
+            ranges.append([width])
+        return groups
+    
+    def _solve_levels(self, group: List[Tuple]) -> Tuple[int, Optional[str]]:
+        """
+        Solve a run of lexicographic levels and bound each of them for the next.
         
-        total_night_hours = sum(self.hours_night[emp_id] for emp_id in self.employees)
-        self.model.Minimize(total_night_hours)
+        If a merged run times out without a solution, its levels are solved one
+        at a time instead.
+        
+        Returns:
+            The solver status, and the name of the level that failed or None
+        """
+        names = " + ".join(name for name, _, _, _ in group)
+        print(f"Optimizing {names}: {', '.join(description for _, description, _, _ in group)}...")
+        
+        if len(group) == 1:
+            self.model.Minimize(group[0][2])
+        else:
+            weights, _ = self._level_weights([self._expression_range(objective) for _, _, objective, _ in group])
+            self.model.Minimize(cp_model.LinearExpr.WeightedSum([objective for _, _, objective, _ in group], weights))
         
         status = self.solver.Solve(self.model)
+        if status == cp_model.UNKNOWN and len(group) > 1:
+            print(f"Warning: {names} reached timeout, solving the levels one at a time...")
+            for level in group:
+                status, failed_level = self._solve_levels([level])
+                if failed_level:
+                    return status, failed_level
+            return status, None
+        
         if status == cp_model.UNKNOWN:
-            print("Warning: Level 3 reached timeout, using partial solution...")
+            print(f"Warning: {names} reached timeout, using partial solution...")
         elif status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return self._create_failed_solution("Level 3 failed")
+            return status, group[0][0]
+        
+        # Fix the levels just solved before moving on
+        bounds = [bound for _, _, _, bound in group if bound is not None]
+        if bounds:
+            for bound in bounds:
+                self.model.Add(bound <= self.solver.Value(bound))
+            self._hint_last_solution()
+        return status, None
+    
+    def _hint_last_solution(self) -> None:
+        """
+        Hint the next lexicographic level with the assignments just found.
         
-        return self._extract_solution(status)
+        Each level only adds a bound that this solution meets, so the hint is
+        feasible and the solver starts from a complete schedule. Only the
+        assignment variables are hinted: the rest follow from them, and
+        hinting every auxiliary variable made single-worker searches cling to
+        the hint far longer than solving from scratch.
+        """
+        values = self._solution_values()
+        self._hint_assignments(values[var.Index()] for var in self.x.values())
+    
+    def _hint_greedy_assignment(self) -> None:
+        """
+        Hint the first solve with a greedy schedule.
+        
+        Shifts are taken in start order and each goes to the eligible
+        employees with the fewest hours so far, FIJOS before COMODINES on ties,
+        skipping anyone with a conflicting shift or, for COMODINES, a post too
+        many. A shift nobody can take is left for the solver to fill.
+        """
+        conflicting = {shift.shift_id: set() for shift in self.shifts}
+        for clique in self.conflict_cliques:
+            clique_ids = {shift.shift_id for shift in clique}
+            for shift_id in clique_ids:
+                conflicting[shift_id] |= clique_ids
+        
+        hours = dict.fromkeys(self.employees, 0)
+        worked = {emp_id: set() for emp_id in self.employees}
+        comodin_posts = {emp_id: set() for emp_id in self.comodines}
+        max_posts = {emp_id: self._comodin_max_posts(self.employees[emp_id]) for emp_id in self.comodines}
+        for shift in sorted(self.shifts, key=lambda shift: (shift.date, shift.start_time)):
+            candidates = [
+                emp_id for emp_id in self.fijos_by_post.get(shift.post_id, []) + self.comodines
+                if (emp_id, shift.shift_id) in self.x
+                and not worked[emp_id] & conflicting[shift.shift_id]
+                and (emp_id not in comodin_posts
+                     or shift.post_id in comodin_posts[emp_id]
+                     or len(comodin_posts[emp_id]) < max_posts[emp_id])
+            ]
+            candidates.sort(key=hours.get)
+            for emp_id in candidates[:self.posts[shift.post_id].required_coverage]:
+                hours[emp_id] += shift.duration_hours
+                worked[emp_id].add(shift.shift_id)
+                if emp_id in comodin_posts:
+                    comodin_posts[emp_id].add(shift.post_id)
+        
+        self._hint_assignments(int(shift_id in worked[emp_id]) for emp_id, shift_id in self.x)
+    
+    def _hint_assignments(self, values: Iterable[int]) -> None:
+        """
+        Replace the model's hints with values for the assignment variables, in self.x order.
+        
+        The hint is written to the model proto in bulk; one AddHint call per
+        variable costs several times more on large months.
+        """
+        self.model.ClearHints()
+        hint = self.model.Proto().solution_hint
+        hint.vars.extend([var.Index() for var in self.x.values()])
+        hint.values.extend(values)
+    
+    def _solution_values(self) -> List[int]:
+        """
+        Values of all model variables in the last solution, by variable index.
+        
+        Reading the response once is much cheaper than one solver.Value call
+        per assignment variable.
+        """
+        return list(self.solver.ResponseProto().solution)
     
     def solve_weighted(self, random_seed: int = 42) -> Solution:
         """Solve using weighted objective function."""
@@ -725,37 +835,46 @@ class ShiftOptimizer:
         self.solver.parameters.random_seed = random_seed
         print(f"🎲 Using random seed: {random_seed}")
         
-        # Calculate weighted objective
-        objective_terms = []
-        
-        # Overtime costs - convert centihours to hours
-        for emp_id in self.employees:
-            salary_per_hour = self.employee_data[emp_id]['salary_per_hour']
-            he_cost = self.he_hours[emp_id] * salary_per_hour * self.config.global_config.he_pct / 100  # Convert centihours
-            objective_terms.append(int(he_cost * self.config.global_config.w_he))
-        
-        # Holiday costs (simplified) - convert centihours to hours
-        for emp_id in self.employees:
-            salary_per_hour = self.employee_data[emp_id]['salary_per_hour']
-            # RF applies only to holiday hours + excess sunday hours (in centihours, so divide by 100)
-            rf_hours_centihours = self.hours_holiday[emp_id] + self.excess_sundays[emp_id] * self.hours_sunday[emp_id]
-            rf_cost = rf_hours_centihours * salary_per_hour * self.config.global_config.rf_pct / 100  # Convert centihours to hours
-            objective_terms.append(int(rf_cost * self.config.global_config.w_rf))
-        
-        # Night costs - convert centihours to hours
-        for emp_id in self.employees:
+        # Weighted cost objective built in one call from integer coefficients.
+        # Hour variables are in centihours and the percentages are fractions,
+        # so one centihour costs salary_per_hour * pct / 100. Zero coefficients
+        # are dropped by WeightedSum, and the excess-Sunday variables are only
+        # worth creating when RF has a cost
+        global_config = self.config.global_config
+        objective_vars = []
+        objective_coeffs = []
+        for emp_id, emp in self.employees.items():
             salary_per_hour = self.employee_data[emp_id]['salary_per_hour']
-            rn_cost = self.hours_night[emp_id] * salary_per_hour * self.config.global_config.rn_pct / 100  # Convert centihours to hours
-            objective_terms.append(int(rn_cost * self.config.global_config.w_rn))
-        
-        # Base salary costs
-        for emp_id in self.employees:
-            base_cost = self.active[emp_id] * self.employees[emp_id].salario_contrato
-            objective_terms.append(int(base_cost * self.config.global_config.w_base))
+            
+            # Overtime costs
+            if emp_id in self.he_hours:
+                objective_vars.append(self.he_hours[emp_id])
+                objective_coeffs.append(int(salary_per_hour * global_config.he_pct / 100 * global_config.w_he))
+            
+            # Holiday costs: RF applies to holiday hours, and to Sunday hours
+            # only beyond the Sunday threshold
+            rf_coeff = int(salary_per_hour * global_config.rf_pct / 100 * global_config.w_rf)
+            objective_vars.append(self.hours_holiday[emp_id])
+            objective_coeffs.append(rf_coeff)
+            if emp_id in self.excess_sundays and rf_coeff:
+                max_centihours_for_employee = len(self.valid_shifts[emp_id]) * global_config.shift_length_hours * 100
+                excess_sunday_hours = self.model.NewIntVar(0, max_centihours_for_employee, f"excess_sunday_hours_{emp_id}" if self.debug else "")
+                self.model.Add(excess_sunday_hours == self.hours_sunday[emp_id]).OnlyEnforceIf(self.excess_sundays[emp_id])
+                self.model.Add(excess_sunday_hours == 0).OnlyEnforceIf(self.excess_sundays[emp_id].Not())
+                objective_vars.append(excess_sunday_hours)
+                objective_coeffs.append(rf_coeff)
+            
+            # Night costs
+            objective_vars.append(self.hours_night[emp_id])
+            objective_coeffs.append(int(salary_per_hour * global_config.rn_pct / 100 * global_config.w_rn))
+            
+            # Base salary costs
+            objective_vars.append(self.active[emp_id])
+            objective_coeffs.append(int(emp.salario_contrato * global_config.w_base))
         
-        if objective_terms:
-            self.model.Minimize(sum(objective_terms))
+        self.model.Minimize(cp_model.LinearExpr.WeightedSum(objective_vars, objective_coeffs))
         
+        self._hint_greedy_assignment()
         status = self.solver.Solve(self.model)
         if status == cp_model.UNKNOWN:
             print("Warning: Final solve reached timeout, using partial solution...")
@@ -784,22 +903,24 @@ class ShiftOptimizer:
         if status == cp_model.UNKNOWN and not self.solver.NumSolutions():
             return self._create_failed_solution("Timeout reached with no solution found")
         
-        # Extract assignments
+        # Extract assignments, and each employee's worked shifts for the metrics
+        values = self._solution_values()
         assignments = {}
+        self.worked_shifts = {}
         for emp_id in self.employees:
-            for shift in self.shifts:
-                if (emp_id, shift.shift_id) in self.x:
-                    if self.solver.Value(self.x[emp_id, shift.shift_id]):
-                        assignments[shift.shift_id] = emp_id
+            worked_shifts = [
+                shift for shift, assignment in zip(self.valid_shifts[emp_id], self.x_by_emp[emp_id])
+                if values[assignment.Index()]
+            ]
+            for shift in worked_shifts:
+                assignments[shift.shift_id] = emp_id
+            self.worked_shifts[emp_id] = worked_shifts
         
         # Extract active employees
-        active_employees = []
-        for emp_id in self.employees:
-            if self.solver.Value(self.active[emp_id]):
-                active_employees.append(emp_id)
+        active_employees = [emp_id for emp_id in self.employees if values[self.active[emp_id].Index()]]
         
         # Store employee metrics for post calculation
-        self.employee_metrics = self._calculate_employee_metrics()
+        self.employee_metrics = self._calculate_employee_metrics(values)
         
         # Calculate metrics
         employee_metrics = self.employee_metrics
@@ -817,37 +938,36 @@ class ShiftOptimizer:
             solve_time=self.solver.WallTime()
         )
     
-    def _calculate_employee_metrics(self) -> Dict[str, Dict]:
-        """Calculate metrics for each employee."""
+    def _calculate_employee_metrics(self, values: List[int]) -> Dict[str, Dict]:
+        """Calculate metrics for each employee from the solution values."""
+        global_config = self.config.global_config
+        threshold = global_config.sunday_threshold
+        rn_pct, rf_pct, he_pct = global_config.rn_pct, global_config.rf_pct, global_config.he_pct
         metrics = {}
         
         for emp_id in self.employees:
             emp = self.employees[emp_id]
             emp_data = self.employee_data[emp_id]
             
-            if self.solver.Value(self.active[emp_id]):
-                hours_assigned = self.solver.Value(self.hours_assigned[emp_id])
+            if values[self.active[emp_id].Index()]:
+                hours_assigned = values[self.hours_assigned[emp_id].Index()]
                 # Convert centihours back to hours
-                hours_night = self.solver.Value(self.hours_night[emp_id]) / 100.0
-                hours_holiday = self.solver.Value(self.hours_holiday[emp_id]) / 100.0
-                hours_sunday = self.solver.Value(self.hours_sunday[emp_id]) / 100.0
-                he_hours = self.solver.Value(self.he_hours[emp_id]) / 100.0  # Convert HE from centihours
+                hours_night = values[self.hours_night[emp_id].Index()] / 100.0
+                hours_holiday = values[self.hours_holiday[emp_id].Index()] / 100.0
+                hours_sunday = values[self.hours_sunday[emp_id].Index()] / 100.0
+                # Convert HE from centihours; employees without overtime have no variable
+                he_hours = values[self.he_hours[emp_id].Index()] / 100.0 if emp_id in self.he_hours else 0.0
                 
                 # Count worked sundays - use same logic as verifier
                 # Count all Sunday dates where the employee actually worked hours
-                sunday_dates_worked = set()
-                for shift in self.shifts:
-                    if (emp_id, shift.shift_id) in self.x and self.solver.Value(self.x[emp_id, shift.shift_id]):
-                        # This employee was assigned this shift
-                        for work_date, day_hours in shift.hours_by_day.items():
-                            if day_hours.is_sunday and day_hours.total_hours > 0:
-                                sunday_dates_worked.add(work_date)
+                sunday_dates_worked = set().union(
+                    *(shift.sunday_dates for shift in self.worked_shifts[emp_id])
+                )
                 
                 num_sundays = len(sunday_dates_worked)
                 
                 # Calculate RF hours based on Sunday work rule
                 # Rule: ≤2 Sundays = only holiday hours, ≥3 Sundays = holiday + Sunday hours
-                threshold = self.config.global_config.sunday_threshold
                 if num_sundays > threshold:
                     # Employee worked more than threshold Sundays, so pay for both holiday and Sunday hours
                     rf_hours_applied = hours_holiday + hours_sunday
@@ -857,9 +977,9 @@ class ShiftOptimizer:
                 
                 # Calculate monetary values
                 salary_per_hour = emp_data['salary_per_hour']
-                val_rn = self.config.global_config.rn_pct * hours_night * salary_per_hour
-                val_rf = self.config.global_config.rf_pct * rf_hours_applied * salary_per_hour
-                val_he = self.config.global_config.he_pct * he_hours * salary_per_hour
+                val_rn = rn_pct * hours_night * salary_per_hour
+                val_rf = rf_pct * rf_hours_applied * salary_per_hour
+                val_he = he_pct * he_hours * salary_per_hour
                 salary_base = emp.salario_contrato
                 total_employee = val_rn + val_rf + val_he + salary_base
                 
@@ -893,39 +1013,30 @@ class ShiftOptimizer:
                     'sueldo_hora': emp_data['salary_per_hour'],
                     'hours_assigned': 0,
                     'hours_to_work': emp_data['hours_to_work'],  # Required hours before overtime
-                    'hours_night': 0,
-                    'hours_holiday': 0,
-                    'hours_sunday': 0,
-                    'num_sundays': 0,
-                    'he_hours': 0,
-                    'rf_hours_applied': 0,
-                    'val_rn': 0,
-                    'val_rf': 0,
-                    'val_he': 0,
-                    'salary_base': 0,
-                    'total_employee': 0
+                    **self.INACTIVE_METRICS
                 }
         
         return metrics
     
     def _calculate_post_metrics(self, assignments: Dict[str, str]) -> Dict[str, Dict]:
         """Calculate metrics for each post."""
+        # Proportional cost allocation (simplified): each shift costs its
+        # employee's cost per assigned hour
+        cost_per_hour = {
+            emp_id: emp_metrics['total_employee'] / emp_metrics['hours_assigned']
+            for emp_id, emp_metrics in self.employee_metrics.items()
+            if emp_metrics['hours_assigned'] > 0
+        }
         metrics = {}
         
         for post_id in self.posts:
-            post_shifts = [shift for shift in self.shifts if shift.post_id == post_id]
+            post_shifts = self.shifts_by_post.get(post_id, [])
             total_cost = 0
             
             for shift in post_shifts:
-                if shift.shift_id in assignments:
-                    emp_id = assignments[shift.shift_id]
-                    if emp_id in self.employee_metrics:
-                        # Proportional cost allocation (simplified)
-                        emp_total = self.employee_metrics[emp_id]['total_employee']
-                        emp_hours = self.employee_metrics[emp_id]['hours_assigned']
-                        if emp_hours > 0:
-                            shift_cost = (emp_total / emp_hours) * shift.duration_hours
-                            total_cost += shift_cost
+                emp_id = assignments.get(shift.shift_id)
+                if emp_id in cost_per_hour:
+                    total_cost += cost_per_hour[emp_id] * shift.duration_hours
             
             metrics[post_id] = {
                 'nombre': self.posts[post_id].nombre,
@@ -938,32 +1049,40 @@ class ShiftOptimizer:
     def _calculate_total_metrics(self, employee_metrics: Dict[str, Dict]) -> Dict:
         """Calculate total metrics across all employees."""
         
-        active_employees = [emp_id for emp_id in employee_metrics if employee_metrics[emp_id]['hours_assigned'] > 0]
-        
-        # Count fixed vs comodines
-        fixed_active = sum(1 for emp_id in active_employees if self.employees[emp_id].tipo == "FIJO")
-        comodines_active = sum(1 for emp_id in active_employees if self.employees[emp_id].tipo == "COMODIN")
-        
-        # Sum totals
-        total_he_hours = sum(employee_metrics[emp_id]['he_hours'] for emp_id in active_employees)
-        total_rf_hours = sum(employee_metrics[emp_id]['rf_hours_applied'] for emp_id in active_employees)
-        total_rn_hours = sum(employee_metrics[emp_id]['hours_night'] for emp_id in active_employees)
+        threshold = self.config.global_config.sunday_threshold
         
-        total_val_he = sum(employee_metrics[emp_id]['val_he'] for emp_id in active_employees)
-        total_val_rf = sum(employee_metrics[emp_id]['val_rf'] for emp_id in active_employees)
-        total_val_rn = sum(employee_metrics[emp_id]['val_rn'] for emp_id in active_employees)
-        total_salary_base = sum(employee_metrics[emp_id]['salary_base'] for emp_id in active_employees)
+        # Count fixed vs comodines and sum totals in one pass over the active employees
+        active_employees = fixed_active = comodines_active = employees_with_excess_sundays = 0
+        total_he_hours = total_rf_hours = total_rn_hours = 0
+        total_val_he = total_val_rf = total_val_rn = total_salary_base = 0
+        for emp_id, metrics in employee_metrics.items():
+            if metrics['hours_assigned'] <= 0:
+                continue
+            
+            active_employees += 1
+            tipo = self.employees[emp_id].tipo
+            if tipo == "FIJO":
+                fixed_active += 1
+            elif tipo == "COMODIN":
+                comodines_active += 1
+            
+            total_he_hours += metrics['he_hours']
+            total_rf_hours += metrics['rf_hours_applied']
+            total_rn_hours += metrics['hours_night']
+            
+            total_val_he += metrics['val_he']
+            total_val_rf += metrics['val_rf']
+            total_val_rn += metrics['val_rn']
+            total_salary_base += metrics['salary_base']
+            
+            # Sunday distribution
+            if metrics['num_sundays'] > threshold:
+                employees_with_excess_sundays += 1
         
         total_cost = total_val_he + total_val_rf + total_val_rn + total_salary_base
         
-        # Sunday distribution
-        employees_with_excess_sundays = sum(
-            1 for emp_id in active_employees 
-            if employee_metrics[emp_id]['num_sundays'] > self.config.global_config.sunday_threshold
-        )
-        
         return {
-            'total_empleados_activos': len(active_employees),
+            'total_empleados_activos': active_employees,
             'fijos_activos': fixed_active,
             'comodines_activos': comodines_active,
             'total_he_hours': total_he_hours,
@@ -1,6 +1,8 @@
 from pathlib import Path
-from typing import List, Dict
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
 import pandas as pd
+import xlsxwriter
 from datetime import datetime
 
 try:
@@ -48,7 +50,7 @@ def create_assignments_sheet(solution: Solution, config: Config,
     """Create the assignments sheet showing daily schedule."""
     
     assignments_data = []
-    employees = {emp.emp_id: emp for emp in config.employees}
+    employees = config.employees_by_id
     
     for shift in shifts:
         emp_id = solution.assignments.get(shift.shift_id, "UNASSIGNED")
@@ -185,45 +187,62 @@ def create_metadata_sheet(solution: Solution, config: Config) -> pd.DataFrame:
     return pd.DataFrame(metadata_data)
 
 
-def create_detailed_validation_report(solution: Solution, config: Config, 
-                                    shifts: List[Shift]) -> pd.DataFrame:
-    """Create detailed validation report for verification."""
+# Columns of the validation report; checks leave the ones they don't use blank
+VALIDATION_REPORT_COLUMNS = ('ValidationCheck', 'EmpID', 'ShiftID', 'PostID', 'Date',
+                             'ExpectedPost', 'Issue', 'Severity')
+
+
+def iter_validation_rows(solution: Solution, config: Config,
+                         shifts: List[Shift]) -> Iterator[Tuple]:
+    """Yield validation report rows, one tuple per VALIDATION_REPORT_COLUMNS."""
     
-    validation_data = []
-    employees = {emp.emp_id: emp for emp in config.employees}
+    found_issue = False
+    employees = config.employees_by_id
+    shifts_by_id = {shift.shift_id: shift for shift in shifts}
     
     # Validate coverage
     for shift in shifts:
         assigned_emp = solution.assignments.get(shift.shift_id)
         if not assigned_emp:
-            validation_data.append({
-                'ValidationCheck': 'Coverage',
-                'ShiftID': shift.shift_id,
-                'PostID': shift.post_id,
-                'Date': shift.date.strftime("%Y-%m-%d"),
-                'Issue': 'No employee assigned',
-                'Severity': 'ERROR'
-            })
+            found_issue = True
+            yield ('Coverage', None, shift.shift_id, shift.post_id, shift.date.strftime("%Y-%m-%d"),
+                   None, 'No employee assigned', 'ERROR')
+    
+    # Group the assigned shifts by employee in one pass over the assignments
+    shifts_by_emp = defaultdict(list)
+    for shift_id, assigned_emp in solution.assignments.items():
+        shifts_by_emp[assigned_emp].append(shift_id)
     
     # Validate employee constraints
     for emp_id in solution.active_employees:
         emp = employees[emp_id]
-        emp_shifts = [shift_id for shift_id, assigned_emp in solution.assignments.items() 
-                     if assigned_emp == emp_id]
         
         # Check fixed employee assignment constraints
         if emp.tipo == "FIJO":
-            for shift_id in emp_shifts:
-                shift = next(s for s in shifts if s.shift_id == shift_id)
+            for shift_id in shifts_by_emp[emp_id]:
+                shift = shifts_by_id[shift_id]
                 if shift.post_id != emp.asignado_post_id:
-                    validation_data.append({
-                        'ValidationCheck': 'FixedEmployeeAssignment',
-                        'EmpID': emp_id,
-                        'ShiftID': shift_id,
-                        'PostID': shift.post_id,
-                        'ExpectedPost': emp.asignado_post_id,
-                        'Issue': 'Fixed employee assigned to wrong post',
-                        'Severity': 'ERROR'
-                    })
-    
-    return pd.DataFrame(validation_data) if validation_data else pd.DataFrame([{'ValidationCheck': 'All validations passed', 'Issue': 'None', 'Severity': 'INFO'}])
\ No newline at end of file
+                    found_issue = True
+                    yield ('FixedEmployeeAssignment', emp_id, shift_id, shift.post_id, None,
+                           emp.asignado_post_id, 'Fixed employee assigned to wrong post', 'ERROR')
+    
+    if not found_issue:
+        yield ('All validations passed', None, None, None, None, None, 'None', 'INFO')
+
+def export_validation_report(rows: Iterable[Tuple], output_path: Path) -> None:
+    """
+    Write validation report rows to Excel as they are produced.
+    
+    xlsxwriter's constant_memory mode flushes each row as soon as the next one
+    starts, so together with iter_validation_rows the report is never held in
+    memory as a whole.
+    """
+    workbook = xlsxwriter.Workbook(str(output_path), {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet('ValidationReport')
+        header_format = workbook.add_format({'bold': True, 'border': 1})
+        worksheet.write_row(0, 0, VALIDATION_REPORT_COLUMNS, header_format)
+        for row_idx, values in enumerate(rows, start=1):
+            worksheet.write_row(row_idx, 0, values)
+    finally:
+        workbook.close()
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime, date, time, timedelta
-from typing import List, Set, Dict
+from typing import List, Set, Dict, FrozenSet
 import calendar
 
 try:
@@ -9,7 +9,7 @@ except ImportError:
     from config_loader import Config
 
 
-@dataclass
+@dataclass(slots=True)
 class DayHours:
     """Represents hours worked on a specific date."""
     date: date
@@ -20,7 +20,7 @@ class DayHours:
     is_holiday: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Shift:
     post_id: str
     date: date  # Start date of shift
@@ -33,6 +33,12 @@ class Shift:
     shift_id: str
     # New: Hours broken down by actual working days
     hours_by_day: Dict[date, DayHours]
+    # Totals over hours_by_day in centihours, the integer unit used by the optimizer
+    night_centihours: int
+    holiday_centihours: int
+    sunday_centihours: int
+    # Sunday dates with hours worked, for counting Sundays per employee
+    sunday_dates: FrozenSet[date]
 
 
 def generate_shifts(config: Config) -> List[Shift]:
@@ -230,6 +236,15 @@ def create_shift(post_id: str, shift_date: date, start_time: time,
     # Determine if shift touches holiday (any day worked is holiday)
     shift_touches_holiday = any(day_hours.is_holiday for day_hours in hours_by_day.values())
     
+    # Night, holiday and Sunday hours in centihours
+    night_hours = sum(day_hours.night_hours for day_hours in hours_by_day.values())
+    holiday_hours = sum(day_hours.total_hours for day_hours in hours_by_day.values() if day_hours.is_holiday)
+    sunday_hours = sum(day_hours.total_hours for day_hours in hours_by_day.values() if day_hours.is_sunday)
+    sunday_dates = frozenset(
+        work_date for work_date, day_hours in hours_by_day.items()
+        if day_hours.is_sunday and day_hours.total_hours > 0
+    )
+    
     # Create unique shift ID
     shift_id = f"{post_id}_{shift_date.strftime('%Y%m%d')}_{shift_type}"
     
@@ -243,7 +258,11 @@ def create_shift(post_id: str, shift_date: date, start_time: time,
         is_sunday=shift_touches_sunday,
         is_holiday=shift_touches_holiday,
         shift_id=shift_id,
-        hours_by_day=hours_by_day
+        hours_by_day=hours_by_day,
+        night_centihours=int(night_hours * 100),
+        holiday_centihours=int(holiday_hours * 100),
+        sunday_centihours=int(sunday_hours * 100),
+        sunday_dates=sunday_dates
     )
 
 
@@ -291,24 +310,40 @@ def calculate_night_hours(shift: Shift, night_start: time, day_start: time) -> f
         return (overlap_end - overlap_start).total_seconds() / 3600
 
 
-def get_shifts_with_conflicts(shifts: List[Shift], min_rest_hours: float = 0) -> List[tuple]:
-    """Get pairs of shifts that conflict due to consecutive shift rule.
-    
-    Simplified rule: An employee cannot work two consecutive shifts:
-    1. Overlapping shifts (same time)
-    2. Back-to-back shifts (one ends when the other starts)
+def get_conflict_cliques(shifts: List[Shift]) -> List[List[Shift]]:
+    """Get the maximal groups of mutually conflicting shifts.
     
-    min_rest_hours parameter is ignored (kept for compatibility).
+    Two shifts conflict when their time spans overlap or touch (see
+    shifts_conflict), so every group is the set of shifts covering a common
+    instant and an employee can work at most one shift of each group. Every
+    conflicting pair lies in at least one group.
     """
     
-    conflicts = []
-    
-    for i, shift1 in enumerate(shifts):
-        for j, shift2 in enumerate(shifts[i+1:], i+1):
-            if shifts_conflict(shift1, shift2):
-                conflicts.append((shift1.shift_id, shift2.shift_id))
-    
-    return conflicts
+    # Sweep start/end events in time order; starts sort before ends at the
+    # same instant so back-to-back shifts share a group
+    events = []
+    for i, shift in enumerate(shifts):
+        start = datetime.combine(shift.date, shift.start_time)
+        end = start + timedelta(hours=shift.duration_hours)
+        events.append((start, 0, i))
+        events.append((end, 1, i))
+    events.sort()
+    
+    cliques = []
+    active = set()
+    last_was_start = False
+    for _, is_end, i in events:
+        if is_end:
+            # The active set is maximal right before the first end that
+            # follows a start
+            if last_was_start and len(active) > 1:
+                cliques.append([shifts[j] for j in sorted(active)])
+            active.discard(i)
+        else:
+            active.add(i)
+        last_was_start = not is_end
+    
+    return cliques
 
 
 def shifts_conflict(shift1: Shift, shift2: Shift, min_rest_hours: float = 0) -> bool:
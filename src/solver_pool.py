@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Process pool shared by the API endpoints that run the solver
+
+The CP-SAT solve and the pandas work around it are CPU bound; running them in
+worker processes keeps the event loop free for other requests and lets
+concurrent solves use separate cores instead of serializing on the GIL.
+"""
+
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# CP-SAT search threads per solve. The portfolio search needs several
+# workers to be effective and gains little past 8, so each solve gets up to 8
+# cores and the concurrent solves are sized to fit beside each other.
+SOLVER_NUM_WORKERS = int(os.environ.get("SOLVER_NUM_WORKERS", min(8, os.cpu_count() or 1)))
+SOLVER_PARAMS = {"num_workers": SOLVER_NUM_WORKERS}
+
+# Solver processes per server worker
+MAX_CONCURRENT_SOLVES = int(os.environ.get("MAX_CONCURRENT_SOLVES", max(1, (os.cpu_count() or 1) // SOLVER_NUM_WORKERS)))
+
+# Solves admitted at once (one per pool process). By default callers wait at
+# most SOLVE_QUEUE_TIMEOUT seconds for a slot and then get a 503, instead of
+# piling up unbounded behind the pool.
+SOLVE_QUEUE_TIMEOUT = float(os.environ.get("SOLVE_QUEUE_TIMEOUT", 1.0))
+solve_semaphore: Optional[asyncio.Semaphore] = None
+
+# Created on startup so every server worker owns its pool instead of
+# inheriting one across fork
+executor: Optional[ProcessPoolExecutor] = None
+_executor_lock: Optional[asyncio.Lock] = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Create the process pool and its solve gate on startup; shut the pool down on exit."""
+    global executor, _executor_lock, solve_semaphore
+    executor = ProcessPoolExecutor(max_workers=MAX_CONCURRENT_SOLVES)
+    _executor_lock = asyncio.Lock()
+    solve_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SOLVES)
+    try:
+        yield
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+
+
+async def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    """Swap in a fresh pool unless a concurrent caller already did."""
+    global executor
+    async with _executor_lock:
+        if executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            executor = ProcessPoolExecutor(max_workers=MAX_CONCURRENT_SOLVES)
+
+
+async def run(func: Callable[..., T], *args,
+              queue_timeout: Optional[float] = SOLVE_QUEUE_TIMEOUT,
+              on_start: Optional[Callable[[], Awaitable]] = None) -> T:
+    """Run func(*args) in the process pool; func and args must be picklable.
+
+    Waits up to queue_timeout seconds (forever if None) for a free solver
+    slot and raises a 503 if none frees up. on_start is awaited once a slot
+    is taken, right before the call is submitted.
+
+    A pool process that dies (e.g. killed for memory) breaks the whole pool,
+    so the pool is rebuilt and the call retried once before giving up with 503.
+    """
+    try:
+        await asyncio.wait_for(solve_semaphore.acquire(), timeout=queue_timeout)
+    except asyncio.TimeoutError:
+        logger.warning("All solver slots busy, rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other schedules. Please retry shortly.",
+            headers={"Retry-After": "30"}
+        )
+
+    loop = asyncio.get_running_loop()
+    try:
+        if on_start is not None:
+            await on_start()
+        for attempt in range(2):
+            pool = executor
+            try:
+                return await loop.run_in_executor(pool, func, *args)
+            except BrokenProcessPool:
+                logger.exception("Solver process pool broke; recreating it")
+                await _replace_broken_executor(pool)
+    finally:
+        solve_semaphore.release()
+    raise HTTPException(
+        status_code=503,
+        detail="Solver pool unavailable. Please retry shortly.",
+        headers={"Retry-After": "30"}
+    )
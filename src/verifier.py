@@ -57,8 +57,8 @@ def verify_solution(solution: Solution, config: Config, shifts: List[Shift]) ->
     result = VerificationResult()
     
     # Create lookup dictionaries
-    employees = {emp.emp_id: emp for emp in config.employees}
-    posts = {post.post_id: post for post in config.posts}
+    employees = config.employees_by_id
+    posts = config.posts_by_id
     shifts_by_id = {shift.shift_id: shift for shift in shifts}
     
     # Group shifts by employee
@@ -90,9 +90,9 @@ class WebConfigService:
         
         return Config(
             global_config=global_config,
-            posts=posts,
-            employees=employees,
-            holidays=holidays
+            posts=tuple(posts),
+            employees=tuple(employees),
+            holidays=tuple(holidays)
         )
     
     @staticmethod
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests for the Excel upload API.
+Covers the result cache, the upload size limit and the /process/async lifecycle
+on a reduced copy of the bundled configuration: 1 post with its fixed employees
+and the comodines.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import openpyxl
+
+# Add the repository root to path for testing
+repo_path = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_path))
+
+# Keep each solver call short; read by the pool processes
+os.environ.setdefault("SOLVER_TIME_LIMIT", "20")
+
+from fastapi.testclient import TestClient
+
+import api_main
+from src import solver_pool
+from src.app_factory import create_app
+
+
+def write_config(path: Path, month: int) -> None:
+    """Write the bundled configuration reduced to post P001 for the given month."""
+    workbook = openpyxl.load_workbook(repo_path / 'config' / 'optimizer_config.xlsx')
+    for campo, valor in workbook['Global'].iter_rows(min_row=2, max_col=2):
+        if campo.value == 'Month':
+            valor.value = month
+    # Keep P001, its fixed employees and the comodines (rows bottom-up so
+    # deleting does not shift the rows still to be checked)
+    puestos = workbook['Puestos']
+    for row in range(puestos.max_row, 1, -1):
+        if puestos.cell(row, 1).value != 'P001':
+            puestos.delete_rows(row)
+    empleados = workbook['Empleados']
+    for row in range(empleados.max_row, 1, -1):
+        if empleados.cell(row, 2).value != 'COMODIN' and empleados.cell(row, 3).value != 'P001':
+            empleados.delete_rows(row)
+    workbook.save(path)
+
+
+class TestProcessAPI(unittest.TestCase):
+    """Test the /process endpoints of the legacy API."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write two configurations that differ only in the month."""
+        cls.work_dir = Path(tempfile.mkdtemp(prefix='shift_api_test_'))
+        cls.config_file = cls.work_dir / 'config.xlsx'
+        cls.other_config_file = cls.work_dir / 'config_other.xlsx'
+        write_config(cls.config_file, month=8)
+        write_config(cls.other_config_file, month=9)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.work_dir, ignore_errors=True)
+
+    def setUp(self):
+        """Start the app with an empty result cache."""
+        self.cache_dir = Path(tempfile.mkdtemp(dir=self.work_dir))
+        self.original_cache_dir = api_main.RESULT_CACHE_DIR
+        api_main.RESULT_CACHE_DIR = self.cache_dir
+        self.client = TestClient(create_app("legacy"))
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        api_main.RESULT_CACHE_DIR = self.original_cache_dir
+
+    def post(self, path: str, config_file: Path, **headers):
+        with open(config_file, 'rb') as f:
+            return self.client.post(path, files={'config_file': ('config.xlsx', f)},
+                                    data={'strategy': 'lexicographic'}, headers=headers)
+
+    def cached_results(self):
+        return sorted(p.name for p in self.cache_dir.glob('*.xlsx'))
+
+    def wait_for_job(self, poll_url: str):
+        """Poll a job until it is finished and return its last status."""
+        deadline = time.monotonic() + 300
+        while True:
+            status = self.client.get(poll_url)
+            self.assertEqual(status.status_code, 200)
+            if status.json()['state'] in api_main.JOB_FINISHED_STATES or time.monotonic() > deadline:
+                return status.json()
+            time.sleep(0.5)
+
+    def write_job(self, task_id: str, state: str, age: float):
+        """Write a job status file last modified age seconds ago."""
+        api_main._write_job_status(task_id, {"state": state, "cache_key": "x", "created": time.time() - age})
+        past = time.time() - age
+        os.utime(self.cache_dir / f"job_{task_id}.json", (past, past))
+
+    def test_result_cache_miss_then_hit(self):
+        """The same upload is solved once and then served from the cache."""
+        first = self.post('/process', self.config_file)
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(first.headers['x-cache'], 'MISS')
+
+        second = self.post('/process', self.config_file)
+        self.assertEqual(second.status_code, 200, second.text)
+        self.assertEqual(second.headers['x-cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(self.cached_results()), 1)
+
+    def test_different_upload_gets_different_digest(self):
+        """A different workbook misses the cache and is stored under its own key."""
+        first = self.post('/process', self.config_file)
+        self.assertEqual(first.headers['x-cache'], 'MISS')
+
+        other = self.post('/process', self.other_config_file)
+        self.assertEqual(other.status_code, 200, other.text)
+        self.assertEqual(other.headers['x-cache'], 'MISS')
+
+        cached = self.cached_results()
+        self.assertEqual(len(cached), 2)
+        digests = {name.split('_')[0] for name in cached}
+        self.assertEqual(len(digests), 2)
+
+    def test_upload_too_large(self):
+        """A declared body over the limit is refused before it is read."""
+        too_large = api_main.MAX_UPLOAD_SIZE + api_main.MULTIPART_OVERHEAD + 1
+        response = self.client.post('/process', content=b'', headers={'Content-Length': str(too_large)})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.cached_results(), [])
+
+    def test_async_job_lifecycle(self):
+        """A queued job goes from submitted to done and its schedule can be downloaded."""
+        submitted = self.post('/process/async', self.config_file)
+        self.assertEqual(submitted.status_code, 202, submitted.text)
+        job = submitted.json()
+        self.assertEqual(job['state'], 'pending')
+
+        self.assertEqual(self.wait_for_job(job['poll_url']), {'task_id': job['task_id'], 'state': 'done'})
+
+        download = self.client.get(job['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download.headers['x-cache'], 'HIT')
+        self.assertTrue(download.content.startswith(b'PK'))
+
+        # The state is read from the shared status file, not from worker memory
+        self.assertTrue((self.cache_dir / f"job_{job['task_id']}.json").exists())
+
+    def test_job_queued_past_ttl(self):
+        """A job still waiting for a solver slot outlives the cache TTL."""
+        # Take every solver slot so the job stays queued
+        for _ in range(solver_pool.MAX_CONCURRENT_SOLVES):
+            self.client.portal.call(solver_pool.solve_semaphore.acquire)
+        try:
+            submitted = self.post('/process/async', self.config_file)
+            job = submitted.json()
+            status_file = self.cache_dir / f"job_{job['task_id']}.json"
+            past = time.time() - api_main.RESULT_CACHE_TTL - 1
+            os.utime(status_file, (past, past))
+
+            api_main._prune_result_cache(list(api_main.job_tasks))
+            self.assertGreater(status_file.stat().st_mtime, past)
+            status = self.client.get(job['poll_url'])
+            self.assertEqual(status.status_code, 200)
+            self.assertEqual(status.json()['state'], 'pending')
+        finally:
+            for _ in range(solver_pool.MAX_CONCURRENT_SOLVES):
+                self.client.portal.call(solver_pool.solve_semaphore.release)
+
+        self.assertEqual(self.wait_for_job(job['poll_url'])['state'], 'done')
+        self.assertEqual(self.client.get(job['download_url']).status_code, 200)
+
+    def test_prune_job_status_files(self):
+        """Finished jobs expire with the TTL and orphaned unfinished jobs are failed."""
+        ttl = api_main.RESULT_CACHE_TTL
+        self.write_job('a' * 32, 'done', age=ttl + 1)
+        self.write_job('b' * 32, 'done', age=ttl - 60)
+        self.write_job('c' * 32, 'running', age=api_main.ORPHANED_JOB_AGE + 1)
+        self.write_job('d' * 32, 'pending', age=api_main.ORPHANED_JOB_AGE - 60)
+
+        api_main._prune_result_cache()
+
+        self.assertEqual(self.client.get(f"/process/{'a' * 32}").status_code, 404)
+        self.assertEqual(self.client.get(f"/process/{'b' * 32}").json()['state'], 'done')
+        orphaned = self.client.get(f"/process/{'c' * 32}").json()
+        self.assertEqual(orphaned['state'], 'error')
+        self.assertEqual(self.client.get(f"/process/{'c' * 32}/download").status_code, 500)
+        self.assertEqual(self.client.get(f"/process/{'d' * 32}").json()['state'], 'pending')
+
+    def test_unknown_job(self):
+        """Polling or downloading an unknown task id is a 404."""
+        task_id = '0' * 32
+        self.assertEqual(self.client.get(f'/process/{task_id}').status_code, 404)
+        self.assertEqual(self.client.get(f'/process/{task_id}/download').status_code, 404)
+        self.assertEqual(self.client.get('/process/not-a-task').status_code, 404)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
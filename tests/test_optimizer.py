@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the lexicographic solve options of the optimizer.
+Uses the bundled configuration reduced to post P001 with its fixed employees
+and the comodines.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+src_path = str(Path(__file__).parent.parent / 'src')
+sys.path.insert(0, src_path)
+
+from config_loader import Config, load_config
+from shift_generator import generate_shifts
+from optimizer import ShiftOptimizer
+
+
+class LevelRecordingOptimizer(ShiftOptimizer):
+    """ShiftOptimizer that keeps the lexicographic levels and how they were grouped."""
+
+    def _group_levels(self, levels):
+        self.levels = levels
+        self.groups = super()._group_levels(levels)
+        return self.groups
+
+    def level_values(self):
+        """Value of each level's objective in the final solution."""
+        return {name: self.solver.Value(objective) for name, _, objective, _ in self.levels}
+
+
+class TestMergedLevels(unittest.TestCase):
+    """Test that merging lexicographic levels keeps the lexicographic optimum."""
+
+    @classmethod
+    def setUpClass(cls):
+        config = load_config(Path(__file__).parent.parent / 'config' / 'optimizer_config.xlsx')
+        cls.config = Config(
+            global_config=config.global_config,
+            holidays=config.holidays,
+            posts=tuple(post for post in config.posts if post.post_id == 'P001'),
+            employees=tuple(
+                emp for emp in config.employees
+                if emp.tipo == 'COMODIN' or emp.asignado_post_id == 'P001'
+            )
+        )
+        cls.shifts = generate_shifts(cls.config)
+
+    def solve(self, sunday_strategy: str, merge_levels: bool) -> LevelRecordingOptimizer:
+        optimizer = LevelRecordingOptimizer(self.config, self.shifts, merge_levels=merge_levels)
+        solution = optimizer.solve_lexicographic(sunday_strategy=sunday_strategy, random_seed=42)
+        self.assertEqual(solution.solver_status, 'OPTIMAL')
+        return optimizer
+
+    def test_merged_levels_reach_sequential_optimum(self):
+        """Every level objective ends at the same value with and without merging."""
+        for sunday_strategy in ('smart', 'balanced', 'cost_focused'):
+            with self.subTest(sunday_strategy=sunday_strategy):
+                sequential = self.solve(sunday_strategy, merge_levels=False)
+                merged = self.solve(sunday_strategy, merge_levels=True)
+
+                self.assertEqual(len(sequential.groups), len(sequential.levels))
+                self.assertLess(len(merged.groups), len(merged.levels))
+                self.assertEqual(merged.level_values(), sequential.level_values())
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
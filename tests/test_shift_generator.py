@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for shift generation.
+Checks the conflict cliques used by the optimizer against the pairwise
+conflict rule on the bundled configuration.
+"""
+
+import sys
+import unittest
+from itertools import combinations
+from pathlib import Path
+
+# Add src to path for testing
+src_path = str(Path(__file__).parent.parent / 'src')
+sys.path.insert(0, src_path)
+
+from config_loader import load_config
+from shift_generator import generate_shifts, get_conflict_cliques, shifts_conflict
+
+
+class TestConflictCliques(unittest.TestCase):
+    """Test get_conflict_cliques against shifts_conflict."""
+
+    @classmethod
+    def setUpClass(cls):
+        config = load_config(Path(__file__).parent.parent / 'config' / 'optimizer_config.xlsx')
+        cls.shifts = generate_shifts(config)
+
+    def test_cliques_cover_exactly_the_conflicting_pairs(self):
+        """Every conflicting pair shares a clique and every clique pair conflicts."""
+        expected = {
+            frozenset((shift1.shift_id, shift2.shift_id))
+            for shift1, shift2 in combinations(self.shifts, 2)
+            if shifts_conflict(shift1, shift2)
+        }
+        from_cliques = {
+            frozenset((shift1.shift_id, shift2.shift_id))
+            for clique in get_conflict_cliques(self.shifts)
+            for shift1, shift2 in combinations(clique, 2)
+        }
+        self.assertTrue(expected)
+        self.assertEqual(from_cliques, expected)
+
+    def test_single_post_pairs(self):
+        """On one post each shift conflicts with the next, and back-to-back shifts only."""
+        post_shifts = [shift for shift in self.shifts if shift.post_id == 'P001']
+        cliques = get_conflict_cliques(post_shifts)
+        pairs = {
+            frozenset((shift1.shift_id, shift2.shift_id))
+            for clique in cliques
+            for shift1, shift2 in combinations(clique, 2)
+        }
+        self.assertEqual(len(pairs), len(post_shifts) - 1)
+        self.assertTrue(all(len(clique) == 2 for clique in cliques))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)